@@ -13,14 +13,42 @@ class Settings(BaseSettings):
     openai_api_base: str = "https://openai-proxy-apigw-genai.api.linecorp.com/v1"
     openai_user_id: str | None = None
     openai_app_title: str | None = None
+    openai_extra_api_bases: list[str] = []
+    openai_model: str = "gpt-4o"
+    openai_fast_model: str | None = None
+    openai_fast_max_chars: int = 20
     line_channel_access_token: str
     line_channel_secret: str
     line_api_timeout: float = 10.0
+    line_reply_deadline_seconds: float = 50.0
+    line_loading_seconds: int = 20
+    line_template_intents: list[str] = ["greeting", "promotions"]
+    line_channels_path: str | None = None
+    line_max_cached_channels: int = 32
     database_url: str
+    database_replica_url: str | None = None
+    db_pool_size: int = 5
+    db_max_overflow: int = 10
+    db_pool_recycle: int = 1800
+    db_pool_timeout: float = 30.0
+    db_read_your_writes_seconds: float = 5.0
     default_user_id: str = "demo-user"
+    coupon_game_ttl_days: int = 30
+    coupon_list_window_days: int = 0
+    coupon_archive_interval: float = 600.0
+    coupon_archive_batch_size: int = 500
+    coupon_redeemed_retention_days: int = 30
+    coupon_archive_purge: bool = False
+    reward_daily_budget: int = 1000
+    reward_user_daily_cap: int = 3
+    reward_shards: int = 8
+    reward_batch_size: int = 10
+    reward_timezone: str = "Asia/Taipei"
     line_login_channel_id: str | None = None
     line_login_channel_secret: str | None = None
     line_login_redirect_uri: str | None = None
+    admin_token: str | None = None
+    loop_stall_threshold_ms: float = 0.0
 
     class Config:
         env_file = ".env"
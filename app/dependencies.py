@@ -1,17 +1,28 @@
 """Dependencies for FastAPI routes."""
 from __future__ import annotations
 
+from datetime import timedelta
 from functools import lru_cache
 
 from fastapi import Depends, Request
+from linebot import LineBotApi, WebhookParser
 from sqlalchemy.orm import Session
 
 from app.config import Settings, get_settings
 from app.services.coupon_service import CouponService
 from app.services.game_service import GameService
-from app.services.line_chat_service import LineChatService
+from app.services.line_channels import (
+    DEFAULT_CHANNEL,
+    ChannelConfig,
+    ChannelStats,
+    LineChannel,
+    LineChannelRegistry,
+)
+from app.services.line_chat_service import LINE_KEYWORDS_PATH, LINE_PROMPT_PATH, LineChatService
+from app.services.line_delivery import LineDelivery
+from app.services.reward_inventory import RewardInventory
 from app.services.web_chat_service import WebChatService
-from database.session import create_session_factory
+from database.session import READ_YOUR_WRITES_COOKIE, create_session_factory
 
 
 @lru_cache
@@ -20,12 +31,20 @@ def _web_chat_service(
     api_base: str,
     user_id: str | None,
     app_title: str | None,
+    extra_api_bases: tuple[str, ...],
+    model: str,
+    fast_model: str | None,
+    fast_max_chars: int,
 ) -> WebChatService:
     return WebChatService(
         api_key=api_key,
         api_base=api_base,
         user_id=user_id,
         app_title=app_title,
+        model=model,
+        extra_api_bases=extra_api_bases,
+        fast_model=fast_model,
+        fast_max_chars=fast_max_chars,
     )
 
 
@@ -35,23 +54,96 @@ def _line_chat_service(
     api_base: str,
     user_id: str | None,
     app_title: str | None,
+    extra_api_bases: tuple[str, ...],
+    model: str,
+    fast_model: str | None,
+    fast_max_chars: int,
+    template_intents: tuple[str, ...],
 ) -> LineChatService:
     return LineChatService(
         api_key=api_key,
         api_base=api_base,
         user_id=user_id,
         app_title=app_title,
+        model=model,
+        template_intents=template_intents,
+        extra_api_bases=extra_api_bases,
+        fast_model=fast_model,
+        fast_max_chars=fast_max_chars,
     )
 
 
 @lru_cache
-def _session_factory(database_url: str):
-    return create_session_factory(database_url)
+def _line_delivery(
+    access_token: str,
+    timeout: float,
+    reply_deadline: float,
+    loading_seconds: int,
+) -> LineDelivery:
+    return LineDelivery(
+        LineBotApi(access_token, timeout=timeout),
+        access_token,
+        reply_deadline=reply_deadline,
+        loading_seconds=loading_seconds,
+        timeout=timeout,
+    )
+
+
+@lru_cache
+def _reward_inventory(
+    daily_budget: int | None,
+    user_daily_cap: int | None,
+    shards: int,
+    batch_size: int,
+    timezone: str,
+) -> RewardInventory:
+    return RewardInventory(
+        daily_budget=daily_budget,
+        user_daily_cap=user_daily_cap,
+        shards=shards,
+        batch_size=batch_size,
+        timezone=timezone,
+    )
+
+
+@lru_cache
+def _session_factory(
+    database_url: str,
+    replica_url: str | None = None,
+    pool_size: int = 5,
+    max_overflow: int = 10,
+    pool_recycle: int = 1800,
+    pool_timeout: float = 30.0,
+):
+    return create_session_factory(
+        database_url,
+        replica_url=replica_url,
+        pool_size=pool_size,
+        max_overflow=max_overflow,
+        pool_recycle=pool_recycle,
+        pool_timeout=pool_timeout,
+    )
 
 
-def get_db(settings: Settings = Depends(get_settings)) -> Session:
-    SessionLocal = _session_factory(settings.database_url)
+def get_session_factory(settings: Settings):
+    """Return the worker-wide session factory configured from settings."""
+
+    return _session_factory(
+        settings.database_url,
+        settings.database_replica_url,
+        settings.db_pool_size,
+        settings.db_max_overflow,
+        settings.db_pool_recycle,
+        settings.db_pool_timeout,
+    )
+
+
+def get_db(request: Request, settings: Settings = Depends(get_settings)) -> Session:
+    SessionLocal = get_session_factory(settings)
     db = SessionLocal()
+    # Read-your-writes across workers: see ReadYourWritesMiddleware.
+    db.info["recent_write"] = READ_YOUR_WRITES_COOKIE in request.cookies
+    request.state.db_session_info = db.info
     try:
         yield db
     finally:
@@ -68,6 +160,10 @@ def get_web_chat_service(
         settings.openai_api_base,
         settings.openai_user_id,
         settings.openai_app_title,
+        tuple(settings.openai_extra_api_bases),
+        settings.openai_model,
+        settings.openai_fast_model,
+        settings.openai_fast_max_chars,
     )
 
 
@@ -79,9 +175,89 @@ def get_line_chat_service(
         settings.openai_api_base,
         settings.openai_user_id,
         settings.openai_app_title,
+        tuple(settings.openai_extra_api_bases),
+        settings.openai_model,
+        settings.openai_fast_model,
+        settings.openai_fast_max_chars,
+        tuple(settings.line_template_intents),
     )
 
 
+def get_line_delivery(settings: Settings = Depends(get_settings)) -> LineDelivery:
+    """Provide the LINE reply/push delivery helper for the messaging channel."""
+
+    return _line_delivery(
+        settings.line_channel_access_token,
+        settings.line_api_timeout,
+        settings.line_reply_deadline_seconds,
+        settings.line_loading_seconds,
+    )
+
+
+def _build_line_channel(
+    config: ChannelConfig,
+    stats: ChannelStats,
+    settings: Settings,
+    shared: LineChatService,
+) -> LineChannel:
+    # Channels share the default channel's chat router (same upstreams) and
+    # FAQ index; only persona, keyword rules and templates are per channel.
+    chat_service = LineChatService(
+        api_key=settings.openai_api_key,
+        api_base=settings.openai_api_base,
+        user_id=settings.openai_user_id,
+        app_title=settings.openai_app_title,
+        keywords_path=config.keywords_path or LINE_KEYWORDS_PATH,
+        persona_path=config.persona_path or LINE_PROMPT_PATH,
+        template_intents=(
+            settings.line_template_intents
+            if config.template_intents is None
+            else config.template_intents
+        ),
+        faq_retriever=shared.faq_retriever,
+        router=shared.router,
+        stats=stats.replies,
+    )
+    delivery = LineDelivery(
+        LineBotApi(config.access_token, timeout=settings.line_api_timeout),
+        config.access_token,
+        reply_deadline=settings.line_reply_deadline_seconds,
+        loading_seconds=settings.line_loading_seconds,
+        timeout=settings.line_api_timeout,
+        stats=stats.delivery,
+    )
+    return LineChannel(config, WebhookParser(config.channel_secret), chat_service, delivery)
+
+
+@lru_cache
+def _line_channel_registry(channels_path: str | None, max_channels: int) -> LineChannelRegistry:
+    # Channel builds need the full settings, which are a process-wide singleton.
+    settings = get_settings()
+    shared = get_line_chat_service(settings)
+    default = LineChannel(
+        ChannelConfig(
+            name=DEFAULT_CHANNEL,
+            channel_secret=settings.line_channel_secret,
+            access_token=settings.line_channel_access_token,
+        ),
+        WebhookParser(settings.line_channel_secret),
+        shared,
+        get_line_delivery(settings),
+    )
+    return LineChannelRegistry(
+        channels_path,
+        factory=lambda config, stats: _build_line_channel(config, stats, settings, shared),
+        default=default,
+        max_channels=max_channels,
+    )
+
+
+def get_line_channels(settings: Settings = Depends(get_settings)) -> LineChannelRegistry:
+    """Provide the per-channel LINE registry (the default channel comes from settings)."""
+
+    return _line_channel_registry(settings.line_channels_path, settings.line_max_cached_channels)
+
+
 def get_current_user_id(
     request: Request,
     settings: Settings = Depends(get_settings),
@@ -105,15 +281,34 @@ def get_coupon_service(
 ) -> CouponService:
     """Provide a coupon service backed by the Postgres database."""
 
+    ttl_days = settings.coupon_game_ttl_days
+    window_days = settings.coupon_list_window_days
     return CouponService(
         session=db,
         default_user_id=user_id,
+        game_coupon_ttl=timedelta(days=ttl_days) if ttl_days > 0 else None,
+        list_window=timedelta(days=window_days) if window_days > 0 else None,
+    )
+
+
+def get_reward_inventory(settings: Settings = Depends(get_settings)) -> RewardInventory:
+    """Provide the worker-wide reward inventory."""
+
+    return _reward_inventory(
+        settings.reward_daily_budget or None,
+        settings.reward_user_daily_cap or None,
+        settings.reward_shards,
+        settings.reward_batch_size,
+        settings.reward_timezone,
     )
 
 
 def get_game_service(
+    db: Session = Depends(get_db),
+    user_id: str = Depends(get_current_user_id),
     coupon_service: CouponService = Depends(get_coupon_service),
+    inventory: RewardInventory = Depends(get_reward_inventory),
 ) -> GameService:
     """Provide a game service that shares the coupon catalog."""
 
-    return GameService(coupon_service=coupon_service)
+    return GameService(coupon_service=coupon_service, reward_gate=inventory.bind(db, user_id))
@@ -1,19 +1,66 @@
 """FastAPI entrypoint wiring all Cony experiences."""
 from __future__ import annotations
 
+import asyncio
+from contextlib import asynccontextmanager
+from datetime import timedelta
+
 from fastapi import FastAPI
 from fastapi.staticfiles import StaticFiles
 
 from app.config import get_settings
-from app.routers import auth, frontend, info, line
+from app.dependencies import get_session_factory
+from app.routers import admin, auth, frontend, info, line, metrics
+from app.services.coupon_archiver import CouponArchiver
+from app.services.loop_monitor import LoopMonitor, LoopMonitorMiddleware
+from database.partitioning import maintain_monthly_partitions
+from database.session import ReadYourWritesMiddleware
 
-app = FastAPI(title="Cony LINE Friend")
 settings = get_settings()
+loop_monitor = (
+    LoopMonitor(threshold=settings.loop_stall_threshold_ms / 1000)
+    if settings.loop_stall_threshold_ms > 0
+    else None
+)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Run background maintenance jobs for the lifetime of the worker."""
+
+    tasks = []
+    if loop_monitor is not None:
+        loop_monitor.start()
+    engine = get_session_factory(settings).kw["bind"]
+    tasks.append(asyncio.create_task(maintain_monthly_partitions(engine)))
+    if settings.coupon_archive_interval > 0:
+        archiver = CouponArchiver(
+            get_session_factory(settings),
+            batch_size=settings.coupon_archive_batch_size,
+            redeemed_retention=timedelta(days=settings.coupon_redeemed_retention_days),
+            purge=settings.coupon_archive_purge,
+        )
+        tasks.append(asyncio.create_task(archiver.run_forever(settings.coupon_archive_interval)))
+    yield
+    for task in tasks:
+        task.cancel()
+    if loop_monitor is not None:
+        loop_monitor.stop()
+
+
+app = FastAPI(title="Cony LINE Friend", lifespan=lifespan)
+app.state.loop_monitor = loop_monitor
+if loop_monitor is not None:
+    app.add_middleware(LoopMonitorMiddleware, monitor=loop_monitor)
+if settings.database_replica_url and settings.db_read_your_writes_seconds > 0:
+    app.add_middleware(ReadYourWritesMiddleware, window=settings.db_read_your_writes_seconds)
 app.state.default_user_id = settings.default_user_id
 app.include_router(line.router)
 app.include_router(info.router)
 app.include_router(frontend.router)
 app.include_router(auth.router)
+app.include_router(metrics.router)
+app.include_router(admin.router)
 app.mount("/static", StaticFiles(directory="frontend/static"), name="static")
 
 
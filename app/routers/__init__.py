@@ -1,6 +1,6 @@
 """Expose routers for FastAPI app."""
 from __future__ import annotations
 
-from app.routers import frontend, info, line
+from app.routers import admin, frontend, info, line, metrics
 
-__all__ = ["frontend", "info", "line"]
+__all__ = ["admin", "frontend", "info", "line", "metrics"]
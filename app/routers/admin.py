@@ -0,0 +1,53 @@
+"""Admin-only diagnostics for a running worker."""
+from __future__ import annotations
+
+import asyncio
+import hmac
+import os
+import time
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request
+from fastapi.responses import PlainTextResponse
+
+from app.config import Settings, get_settings
+from app.services.profiler import ProfilerBusyError, sample_stacks
+
+router = APIRouter(prefix="/admin", tags=["admin"])
+
+
+def require_admin(
+    x_admin_token: str | None = Header(None, alias="X-Admin-Token"),
+    settings: Settings = Depends(get_settings),
+) -> None:
+    if not settings.admin_token:
+        raise HTTPException(status_code=503, detail="Admin token 尚未設定")
+    if not x_admin_token or not hmac.compare_digest(x_admin_token, settings.admin_token):
+        raise HTTPException(status_code=403, detail="Forbidden")
+
+
+@router.get("/loop-stalls", dependencies=[Depends(require_admin)])
+async def loop_stall_stats(request: Request) -> dict:
+    """Recent event-loop stalls with the blocking stack and route."""
+
+    monitor = getattr(request.app.state, "loop_monitor", None)
+    if monitor is None:
+        return {"enabled": False}
+    return {"enabled": True, **monitor.snapshot()}
+
+
+@router.post("/profile", dependencies=[Depends(require_admin)])
+async def profile_worker(
+    seconds: float = Query(10.0, gt=0, le=60),
+    interval_ms: float = Query(10.0, ge=1, le=1000),
+) -> PlainTextResponse:
+    """Sample this worker's stacks for ``seconds`` and download collapsed stacks."""
+
+    try:
+        collapsed = await asyncio.to_thread(sample_stacks, seconds, interval_ms / 1000)
+    except ProfilerBusyError as exc:
+        raise HTTPException(status_code=409, detail=str(exc)) from exc
+    filename = f"profile-{os.getpid()}-{int(time.time())}.collapsed"
+    return PlainTextResponse(
+        collapsed,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
@@ -1,18 +1,30 @@
 """Routers for informational and interactive endpoints."""
 from __future__ import annotations
 
-from typing import Literal
+from typing import List, Literal
 
-from fastapi import APIRouter, Depends, HTTPException
-from fastapi.responses import HTMLResponse
-from pydantic import BaseModel, Field
+from fastapi import APIRouter, Depends, Header, HTTPException
+from fastapi.responses import HTMLResponse, ORJSONResponse
+from pydantic import BaseModel, Field, constr
 
 from app.dependencies import get_coupon_service, get_game_service, get_web_chat_service
+from app.schemas import CouponList, PlayResponse, UseCouponResponse, UseCouponsResponse
 from app.services.web_chat_service import WebChatService
-from app.services.coupon_service import CouponService
+from app.services.coupon_service import CONSUMED, KEY_CONFLICT, CouponService
 from app.services.game_service import CHOICES, GameResult, GameService
 
-router = APIRouter(tags=["cony-extras"])
+router = APIRouter(tags=["cony-extras"], default_response_class=ORJSONResponse)
+
+
+def _orjson(model: BaseModel) -> ORJSONResponse:
+    """Render a typed response with orjson.
+
+    Returning a Response makes FastAPI skip its response_model pass (dump to
+    dict, validate again, encode); the route's ``response_model`` still
+    documents the schema.
+    """
+
+    return ORJSONResponse(model.model_dump())
 
 
 class ChatRequest(BaseModel):
@@ -34,6 +46,10 @@ class UseCouponRequest(BaseModel):
     coupon_code: str = Field(..., min_length=1, max_length=64)
 
 
+class UseCouponsRequest(BaseModel):
+    coupon_codes: List[constr(min_length=1, max_length=64)] = Field(..., min_length=1, max_length=100)
+
+
 def _render_about_cony() -> str:
     traits = [
         "性格活潑外向、熱情可愛，總是第一個帶起氣氛",
@@ -59,11 +75,13 @@ async def about_cony() -> str:
     return _render_about_cony()
 
 
-@router.get("/coupons")
-async def view_coupons(coupon_service: CouponService = Depends(get_coupon_service)) -> dict:
+@router.get("/coupons", response_model=CouponList)
+async def view_coupons(
+    coupon_service: CouponService = Depends(get_coupon_service),
+) -> ORJSONResponse:
     """Return all currently available coupons."""
 
-    return {"coupons": coupon_service.list_coupons()}
+    return _orjson(CouponList(coupons=coupon_service.list_coupons()))
 
 
 @router.post("/chat-with-cony")
@@ -77,11 +95,11 @@ async def chat_with_cony(
     return {"reply": reply}
 
 
-@router.post("/play-with-cony")
+@router.post("/play-with-cony", response_model=PlayResponse)
 async def play_with_cony(
     payload: PlayRequest,
     game_service: GameService = Depends(get_game_service),
-) -> dict:
+) -> ORJSONResponse:
     """Run a guessing game round between the caller and Cony."""
 
     try:
@@ -89,23 +107,41 @@ async def play_with_cony(
     except ValueError as exc:  # pragma: no cover - FastAPI handles validation
         raise HTTPException(status_code=400, detail=str(exc)) from exc
 
-    return {
-        "player_choice": result.player_choice,
-        "cony_choice": result.cony_choice,
-        "did_win": result.did_win,
-        "reward": result.reward,
-        "available_choices": CHOICES,
-    }
+    return _orjson(
+        PlayResponse(
+            player_choice=result.player_choice,
+            cony_choice=result.cony_choice,
+            did_win=result.did_win,
+            reward=result.reward,
+            available_choices=CHOICES,
+        )
+    )
 
 
-@router.post("/use-coupon")
+@router.post("/use-coupon", response_model=UseCouponResponse)
 async def use_coupon(
     payload: UseCouponRequest,
+    idempotency_key: str | None = Header(None, alias="Idempotency-Key", max_length=64),
     coupon_service: CouponService = Depends(get_coupon_service),
-) -> dict:
+) -> ORJSONResponse:
     """Consume a coupon by removing it from the user's catalog."""
 
-    success = coupon_service.consume_coupon(payload.coupon_code)
-    if not success:
+    status = coupon_service.consume_coupon(payload.coupon_code, idempotency_key)
+    if status == KEY_CONFLICT:
+        raise HTTPException(status_code=409, detail="這個 Idempotency-Key 已用於另一張優惠券")
+    if status != CONSUMED:
         raise HTTPException(status_code=404, detail="找不到這張優惠券")
-    return {"status": "consumed", "code": payload.coupon_code}
+    return _orjson(UseCouponResponse(status=CONSUMED, code=payload.coupon_code))
+
+
+@router.post("/use-coupons", response_model=UseCouponsResponse)
+async def use_coupons(
+    payload: UseCouponsRequest,
+    idempotency_key: str | None = Header(None, alias="Idempotency-Key", max_length=64),
+    coupon_service: CouponService = Depends(get_coupon_service),
+) -> ORJSONResponse:
+    """Redeem a batch of coupons in one transaction and report each code."""
+
+    results = coupon_service.consume_coupons(payload.coupon_codes, idempotency_key)
+    consumed = sum(1 for result in results if result["status"] == CONSUMED)
+    return _orjson(UseCouponsResponse(results=results, consumed=consumed))
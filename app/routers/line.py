@@ -1,48 +1,96 @@
 """LINE webhook router."""
 from __future__ import annotations
 
+import asyncio
 import logging
 
 from fastapi import APIRouter, Depends, Header, HTTPException, Request
-from linebot import LineBotApi, WebhookParser
 from linebot.exceptions import InvalidSignatureError
-from linebot.models import MessageEvent, TextMessage, TextSendMessage
+from linebot.models import FlexSendMessage, MessageEvent, TextMessage, TextSendMessage
 
-from app.config import Settings, get_settings
-from app.dependencies import get_line_chat_service
+from app.dependencies import get_line_channels
+from app.services.base_chat_service import ChatReply
+from app.services.line_channels import DEFAULT_CHANNEL, LineChannel, LineChannelRegistry
 from app.services.line_chat_service import LineChatService
+from app.services.line_delivery import LineDelivery
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(tags=["line-webhook"])
 
 
+def _to_line_message(reply: ChatReply):
+    if reply.flex:
+        return FlexSendMessage(alt_text=reply.text[:400], contents=reply.flex)
+    return TextSendMessage(text=reply.text)
+
+
+async def _handle_text_event(
+    event: MessageEvent,
+    chat_service: LineChatService,
+    delivery: LineDelivery,
+) -> None:
+    user_text = event.message.text or ""
+    # The animation call runs alongside generation so it adds no latency.
+    _, reply = await asyncio.gather(
+        delivery.start_loading(event),
+        chat_service.respond(user_text),
+    )
+    await delivery.deliver(event, _to_line_message(reply))
+
+
+async def _handle_webhook(request: Request, signature: str, channel: LineChannel) -> dict:
+    body = await request.body()
+    try:
+        events = channel.parser.parse(body.decode("utf-8"), signature)
+    except InvalidSignatureError as exc:  # pragma: no cover - defensive
+        logger.warning("Invalid LINE signature for channel %s: %s", channel.name, exc)
+        raise HTTPException(status_code=400, detail="Invalid signature") from exc
+
+    text_events = [
+        event
+        for event in events
+        if isinstance(event, MessageEvent) and isinstance(event.message, TextMessage)
+    ]
+    # One failed event must not fail the webhook: LINE would redeliver the
+    # whole batch and the other users would get their answers twice.
+    results = await asyncio.gather(
+        *(_handle_text_event(event, channel.chat_service, channel.delivery) for event in text_events),
+        return_exceptions=True,
+    )
+    for event, result in zip(text_events, results):
+        if isinstance(result, Exception):
+            logger.error(
+                "LINE event %s on channel %s failed",
+                getattr(event, "webhook_event_id", None) or event.message.id,
+                channel.name,
+                exc_info=result,
+            )
+
+    return {"received_events": len(events)}
+
+
 @router.post("/callback")
 async def line_callback(
     request: Request,
     x_line_signature: str = Header(..., alias="x-line-signature"),
-    settings: Settings = Depends(get_settings),
-    chat_service: LineChatService = Depends(get_line_chat_service),
+    channels: LineChannelRegistry = Depends(get_line_channels),
 ) -> dict:
     """Receive LINE webhook events and reply using the Cony chat persona."""
 
-    body = await request.body()
-    parser = WebhookParser(settings.line_channel_secret)
-    line_bot_api = LineBotApi(settings.line_channel_access_token)
+    return await _handle_webhook(request, x_line_signature, await channels.resolve(DEFAULT_CHANNEL))
 
-    try:
-        events = parser.parse(body.decode("utf-8"), x_line_signature)
-    except InvalidSignatureError as exc:  # pragma: no cover - defensive
-        logger.warning("Invalid LINE signature: %s", exc)
-        raise HTTPException(status_code=400, detail="Invalid signature") from exc
 
-    for event in events:
-        if isinstance(event, MessageEvent) and isinstance(event.message, TextMessage):
-            user_text = event.message.text or ""
-            reply_text = await chat_service.generate_reply(user_text)
-            line_bot_api.reply_message(
-                event.reply_token,
-                TextSendMessage(text=reply_text),
-            )
+@router.post("/callback/{channel}")
+async def line_channel_callback(
+    channel: str,
+    request: Request,
+    x_line_signature: str = Header(..., alias="x-line-signature"),
+    channels: LineChannelRegistry = Depends(get_line_channels),
+) -> dict:
+    """Webhook for one of the channels configured in ``LINE_CHANNELS_PATH``."""
 
-    return {"received_events": len(events)}
+    line_channel = await channels.resolve(channel)
+    if line_channel is None:
+        raise HTTPException(status_code=404, detail="Unknown LINE channel")
+    return await _handle_webhook(request, x_line_signature, line_channel)
@@ -0,0 +1,62 @@
+"""Operational counters for tuning the Cony services."""
+from __future__ import annotations
+
+from fastapi import APIRouter, Depends
+
+from app.config import Settings, get_settings
+from app.dependencies import (
+    get_line_channels,
+    get_line_chat_service,
+    get_session_factory,
+    get_web_chat_service,
+)
+from app.services.line_channels import LineChannelRegistry
+from app.services.line_chat_service import LineChatService
+from app.services.web_chat_service import WebChatService
+from database.session import pool_stats
+
+router = APIRouter(prefix="/metrics", tags=["metrics"])
+
+
+@router.get("/line-channels")
+async def line_channel_stats(channels: LineChannelRegistry = Depends(get_line_channels)) -> dict:
+    """Configured vs. cached LINE channels and registry churn."""
+
+    return channels.snapshot()
+
+
+@router.get("/line-replies")
+async def line_reply_stats(channels: LineChannelRegistry = Depends(get_line_channels)) -> dict:
+    """Share of LINE replies served from local templates vs. the LLM, per channel."""
+
+    return {name: stats.replies.snapshot() for name, stats in channels.stats().items()}
+
+
+@router.get("/line-delivery")
+async def line_delivery_stats(channels: LineChannelRegistry = Depends(get_line_channels)) -> dict:
+    """How LINE answers were delivered (reply vs. push fallback), per channel."""
+
+    return {name: stats.delivery.snapshot() for name, stats in channels.stats().items()}
+
+
+@router.get("/chat-routes")
+async def chat_route_stats(
+    line_chat_service: LineChatService = Depends(get_line_chat_service),
+    web_chat_service: WebChatService = Depends(get_web_chat_service),
+) -> dict:
+    """Per-route and per-endpoint latency/error stats behind routing decisions.
+
+    All LINE channels share one router.
+    """
+
+    return {
+        "line": line_chat_service.router.snapshot(),
+        "web": web_chat_service.router.snapshot(),
+    }
+
+
+@router.get("/db-pool")
+async def db_pool_stats(settings: Settings = Depends(get_settings)) -> dict:
+    """Connection pool usage and checkout wait times, for pool sizing."""
+
+    return pool_stats(get_session_factory(settings))
@@ -0,0 +1,46 @@
+"""Typed response models for the coupon and game APIs."""
+from __future__ import annotations
+
+from typing import List, Literal, Optional, Tuple
+
+from pydantic import BaseModel
+
+
+class CouponOut(BaseModel):
+    id: str
+    title: str
+    description: str = ""
+    source: Literal["game", "catalog"]
+
+
+class CouponList(BaseModel):
+    coupons: List[CouponOut]
+
+
+class Reward(BaseModel):
+    message: str
+    coupons: List[CouponOut]
+    new_coupon: Optional[CouponOut] = None
+
+
+class PlayResponse(BaseModel):
+    player_choice: str
+    cony_choice: str
+    did_win: bool
+    reward: Reward
+    available_choices: Tuple[str, ...]
+
+
+class UseCouponResponse(BaseModel):
+    status: Literal["consumed"]
+    code: str
+
+
+class RedemptionResult(BaseModel):
+    code: str
+    status: Literal["consumed", "not_found"]
+
+
+class UseCouponsResponse(BaseModel):
+    results: List[RedemptionResult]
+    consumed: int
@@ -2,12 +2,54 @@
 from __future__ import annotations
 
 import asyncio
+import time
+from dataclasses import dataclass
 from pathlib import Path
-from typing import List, Optional
+from typing import List, Optional, Sequence
 
 import requests
 from requests import RequestException
 
+from app.services.chat_router import ChatRouter
+from app.services.template_responder import ResponseStats, TemplateResponder
+
+
+def _elapsed_ms(started: float) -> float:
+    return (time.perf_counter() - started) * 1000
+
+
+def _completion_text(response: requests.Response) -> str:
+    """Extract the reply; a 200 with an unexpected body counts as a failure."""
+
+    try:
+        return response.json()["choices"][0]["message"]["content"].strip()
+    except (ValueError, KeyError, IndexError, TypeError, AttributeError) as exc:
+        raise RequestException(
+            f"Unexpected completion body from {response.url}: {exc!r}", response=response
+        ) from exc
+
+
+def _retryable(exc: RequestException) -> bool:
+    """Timeouts, connection errors, 429 and 5xx are the endpoint's fault.
+
+    Other 4xx mean the request itself is wrong (bad key, bad payload); another
+    endpoint would reject it too, so it is neither retried nor held against
+    the endpoint's health.
+    """
+
+    response = exc.response
+    if response is None or not isinstance(exc, requests.HTTPError):
+        return True
+    return response.status_code == 429 or response.status_code >= 500
+
+
+@dataclass
+class ChatReply:
+    text: str
+    source: str = "llm"
+    intent: Optional[str] = None
+    flex: Optional[dict] = None
+
 
 class BaseChatService:
     """Wraps interactions with the chat completion API."""
@@ -22,17 +64,30 @@ class BaseChatService:
         model: str = "gpt-4o",
         timeout: int = 30,
         fallback_persona: str | None = None,
+        templates: TemplateResponder | None = None,
+        extra_api_bases: Sequence[str] = (),
+        fast_model: str | None = None,
+        fast_max_chars: int = 20,
+        router: ChatRouter | None = None,
+        stats: ResponseStats | None = None,
     ) -> None:
         self._api_key = api_key
-        self._api_base = api_base.rstrip("/")
-        self._endpoint = f"{self._api_base}/chat/completions"
         self._user_id = user_id
         self._app_title = app_title
-        self._model = model
+        # Services talking to the same upstreams can share one router, so
+        # endpoint health and cooldowns are learned once.
+        self.router = router or ChatRouter(
+            [api_base, *extra_api_bases],
+            model=model,
+            fast_model=fast_model,
+            fast_max_chars=fast_max_chars,
+        )
         self._timeout = timeout
         self._persona_path = Path(persona_path)
         self._fallback_persona = fallback_persona
         self._persona = self._load_persona()
+        self._templates = templates
+        self.stats = stats or ResponseStats()
 
     def _load_persona(self) -> str:
         if self._persona_path.exists():
@@ -61,29 +116,74 @@ class BaseChatService:
             },
         ]
 
-    async def generate_reply(self, user_text: str) -> str:
-        """Call the chat completion API in a worker thread."""
+    async def complete(self, user_text: str, route: str | None = None) -> str:
+        """Call the chat completion API in a worker thread, raising on failure.
+
+        ``route`` forces a model route; otherwise the router picks one from the
+        message. Endpoints are tried in latency order until one succeeds; a client
+        error other than 429 is raised at once without trying the others.
+        """
+
+        route = self.router.choose_route(user_text, route)
+        payload = {
+            "model": self.router.model_for(route),
+            "messages": self._build_messages(user_text),
+            "temperature": 0.85,
+            "max_tokens": 300,
+        }
 
         def _call() -> str:
-            payload = {
-                "model": self._model,
-                "messages": self._build_messages(user_text),
-                "temperature": 0.85,
-                "max_tokens": 300,
-            }
-            response = requests.post(
-                self._endpoint,
-                headers=self._headers(),
-                json=payload,
-                timeout=self._timeout,
-            )
-            response.raise_for_status()
-            data = response.json()
-            return data["choices"][0]["message"]["content"].strip()
+            request_started = time.perf_counter()
+            last_error: RequestException | None = None
+            for endpoint in self.router.endpoints():
+                started = time.perf_counter()
+                try:
+                    response = requests.post(
+                        endpoint.url,
+                        headers=self._headers(),
+                        json=payload,
+                        timeout=self._timeout,
+                    )
+                    response.raise_for_status()
+                    content = _completion_text(response)
+                except RequestException as exc:
+                    if not _retryable(exc):
+                        self.router.record_request(route, _elapsed_ms(request_started), ok=False)
+                        raise
+                    self.router.record_attempt(endpoint, _elapsed_ms(started), ok=False)
+                    last_error = exc
+                    continue
+                self.router.record_attempt(endpoint, _elapsed_ms(started), ok=True)
+                self.router.record_request(route, _elapsed_ms(request_started), ok=True)
+                return content
+            self.router.record_request(route, _elapsed_ms(request_started), ok=False)
+            raise last_error
+
+        return await asyncio.to_thread(_call)
+
+    async def generate_reply(self, user_text: str, route: str | None = None) -> str:
+        """Return a persona reply, or a friendly apology if the upstream fails."""
 
         try:
-            return await asyncio.to_thread(_call)
+            return await self.complete(user_text, route)
         except RequestException:
             return "Cony 暫時連不上粉紅雲端，先跟你抱歉！稍後再試一次好嗎？"
         except Exception:
             return "Cony 今天有點累，等我補妝一下再回你～"
+
+    async def respond(self, user_text: str) -> ChatReply:
+        """Serve matched intents from local templates, otherwise call the LLM."""
+
+        if self._templates is not None:
+            template = self._templates.render(user_text)
+            if template is not None:
+                self.stats.record("template", template.intent)
+                return ChatReply(
+                    text=template.text,
+                    source="template",
+                    intent=template.intent,
+                    flex=template.flex,
+                )
+        text = await self.generate_reply(user_text)
+        self.stats.record("llm")
+        return ChatReply(text=text)
@@ -0,0 +1,299 @@
+"""Personalized campaign pushes to LINE user segments via multicast."""
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import logging
+import re
+import time
+import uuid
+from dataclasses import dataclass, field
+from pathlib import Path
+from string import Formatter
+from typing import Dict, Iterable, List, Optional, Sequence
+
+from linebot.exceptions import LineBotApiError
+from linebot.models import TextSendMessage
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from app.services.base_chat_service import BaseChatService
+from database.models import AppUser, Coupon, CouponStatus
+from database.session import READ_REPLICA_OPTION
+
+logger = logging.getLogger(__name__)
+
+CHECKPOINT_DIR = Path(__file__).resolve().parent.parent.parent / "data" / "broadcasts"
+MULTICAST_MAX_RECIPIENTS = 500
+# Only real LINE user ids can receive a multicast; anything else 400s the chunk.
+LINE_USER_ID = re.compile(r"U[0-9a-f]{32}")
+
+
+@dataclass
+class BroadcastTarget:
+    user_id: str
+    context: Dict[str, object] = field(default_factory=dict)
+
+
+@dataclass
+class BroadcastReport:
+    campaign_id: str
+    dry_run: bool
+    targets: int = 0
+    unique_prompts: int = 0
+    generated: int = 0
+    chunks_sent: int = 0
+    recipients_sent: int = 0
+    skipped_already_sent: int = 0
+    failed_prompts: int = 0
+    failed_chunks: int = 0
+    failed_recipients: int = 0
+    messages: Dict[str, int] = field(default_factory=dict)
+    chunk_errors: Dict[str, str] = field(default_factory=dict)
+
+
+class StubLineBotApi:
+    """Records multicast calls instead of sending them (dry-run mode)."""
+
+    def __init__(self) -> None:
+        self.calls: List[dict] = []
+
+    def multicast(self, to, messages, retry_key=None, **kwargs) -> None:
+        self.calls.append(
+            {
+                "to": list(to),
+                "messages": [message.as_json_dict() for message in messages],
+                "retry_key": retry_key,
+            }
+        )
+
+
+def load_targets(
+    session: Session,
+    user_ids: Optional[Iterable[str]] = None,
+    exclude_user_id: Optional[str] = None,
+) -> List[BroadcastTarget]:
+    """Read ``app_user`` rows with the fields available to prompt templates.
+
+    Rows that are not LINE user ids (web visitors, ``exclude_user_id``, i.e.
+    the shared demo user) are skipped.
+    """
+
+    query = (
+        select(AppUser.user_id, func.count(Coupon.id))
+        .outerjoin(
+            Coupon,
+            (Coupon.user_id == AppUser.user_id) & (Coupon.status == CouponStatus.active),
+        )
+        .group_by(AppUser.user_id)
+        .order_by(AppUser.user_id)
+        .execution_options(**{READ_REPLICA_OPTION: True})
+    )
+    if user_ids is not None:
+        query = query.where(AppUser.user_id.in_(list(user_ids)))
+    targets: List[BroadcastTarget] = []
+    skipped = 0
+    for user_id, coupon_count in session.execute(query):
+        if user_id == exclude_user_id or not LINE_USER_ID.fullmatch(user_id):
+            skipped += 1
+            continue
+        targets.append(BroadcastTarget(user_id=user_id, context={"coupon_count": coupon_count}))
+    if skipped:
+        logger.info("Skipped %d users without a LINE user id", skipped)
+    return targets
+
+
+class _Checkpoint:
+    """Append-only JSONL progress log so an interrupted campaign can resume.
+
+    Each generated text, retry key and chunk outcome is one line, written once,
+    so the log grows with the campaign instead of being rewritten per chunk.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self._path = path
+        self.generated: Dict[str, str] = {}
+        self.sent: set[str] = set()
+        self.retry_keys: Dict[str, str] = {}
+        self.failed: Dict[str, str] = {}
+        content = path.read_text(encoding="utf-8") if path.exists() else ""
+        for line in content.splitlines():
+            try:
+                self._apply(json.loads(line))
+            except (ValueError, KeyError, TypeError):
+                # A crash mid-write leaves a torn last line; that record is redone.
+                logger.warning("Skipping unreadable checkpoint line in %s", path)
+        self._needs_newline = bool(content) and not content.endswith("\n")
+
+    def _apply(self, record: dict) -> None:
+        kind = record["type"]
+        if kind == "generated":
+            self.generated[record["prompt"]] = record["text"]
+        elif kind == "retry_key":
+            self.retry_keys[record["chunk"]] = record["key"]
+        elif kind == "sent":
+            self.sent.update(record["to"])
+            self.failed.pop(record["chunk"], None)
+        elif kind == "failed":
+            self.failed[record["chunk"]] = record["error"]
+
+    def append(self, **record) -> None:
+        self._apply(record)
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        with self._path.open("a", encoding="utf-8") as fh:
+            if self._needs_newline:
+                fh.write("\n")
+                self._needs_newline = False
+            fh.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+
+class BroadcastService:
+    """Generates one message per distinct prompt and multicasts it in chunks.
+
+    Targets whose rendered prompts are identical share a single LLM call. Each
+    chunk gets a stable LINE ``retry_key`` stored in the checkpoint, so a chunk
+    retried after a crash is not delivered twice. A chunk LINE rejects (4xx
+    other than 409/429) is recorded in the report and checkpoint and the run
+    moves on; its recipients are retried when the campaign is resumed.
+    """
+
+    def __init__(
+        self,
+        chat_service: BaseChatService,
+        line_bot_api,
+        concurrency: int = 4,
+        chunk_size: int = MULTICAST_MAX_RECIPIENTS,
+        requests_per_second: float = 10.0,
+        max_retries: int = 5,
+        checkpoint_dir: str | Path = CHECKPOINT_DIR,
+    ) -> None:
+        self._chat_service = chat_service
+        self._line_bot_api = line_bot_api
+        self._concurrency = concurrency
+        self._chunk_size = min(chunk_size, MULTICAST_MAX_RECIPIENTS)
+        self._min_interval = 1.0 / requests_per_second if requests_per_second > 0 else 0.0
+        self._max_retries = max_retries
+        self._checkpoint_dir = Path(checkpoint_dir)
+        self._last_send = 0.0
+
+    async def run(
+        self,
+        campaign_id: str,
+        prompt_template: str,
+        targets: Sequence[BroadcastTarget],
+        dry_run: bool = False,
+    ) -> BroadcastReport:
+        report = BroadcastReport(campaign_id=campaign_id, dry_run=dry_run, targets=len(targets))
+        suffix = ".dry-run.jsonl" if dry_run else ".jsonl"
+        checkpoint = _Checkpoint(self._checkpoint_dir / f"{campaign_id}{suffix}")
+        line_bot_api = StubLineBotApi() if dry_run else self._line_bot_api
+
+        recipients_by_prompt: Dict[str, List[str]] = {}
+        for target in targets:
+            if target.user_id in checkpoint.sent:
+                report.skipped_already_sent += 1
+                continue
+            prompt = _render(prompt_template, target)
+            recipients_by_prompt.setdefault(prompt, []).append(target.user_id)
+        report.unique_prompts = len(recipients_by_prompt)
+
+        await self._generate(recipients_by_prompt, checkpoint, report)
+
+        recipients_by_text: Dict[str, List[str]] = {}
+        for prompt, user_ids in recipients_by_prompt.items():
+            text = checkpoint.generated.get(prompt)
+            if text is None:
+                report.failed_prompts += 1
+                continue
+            recipients_by_text.setdefault(text, []).extend(user_ids)
+        report.messages = {text: len(user_ids) for text, user_ids in recipients_by_text.items()}
+
+        for text, user_ids in recipients_by_text.items():
+            for start in range(0, len(user_ids), self._chunk_size):
+                chunk = user_ids[start : start + self._chunk_size]
+                chunk_id = f"{_hash_text(text)}:{chunk[0]}:{len(chunk)}"
+                if chunk_id not in checkpoint.retry_keys:
+                    checkpoint.append(type="retry_key", chunk=chunk_id, key=str(uuid.uuid4()))
+                retry_key = checkpoint.retry_keys[chunk_id]
+                try:
+                    await self._multicast(line_bot_api, chunk, text, retry_key)
+                except LineBotApiError as exc:
+                    if not _rejected(exc):
+                        raise
+                    error = f"{exc.status_code}: {exc.error.message if exc.error else exc}"
+                    logger.warning("Broadcast chunk %s rejected: %s", chunk_id, error)
+                    checkpoint.append(type="failed", chunk=chunk_id, to=chunk, error=error)
+                    report.failed_chunks += 1
+                    report.failed_recipients += len(chunk)
+                    report.chunk_errors[chunk_id] = error
+                    continue
+                checkpoint.append(type="sent", chunk=chunk_id, to=chunk)
+                report.chunks_sent += 1
+                report.recipients_sent += len(chunk)
+
+        return report
+
+    async def _generate(
+        self,
+        recipients_by_prompt: Dict[str, List[str]],
+        checkpoint: _Checkpoint,
+        report: BroadcastReport,
+    ) -> None:
+        semaphore = asyncio.Semaphore(self._concurrency)
+
+        async def _one(prompt: str) -> None:
+            async with semaphore:
+                try:
+                    text = await self._chat_service.complete(prompt)
+                except Exception as exc:  # keep going; the prompt is reported as failed
+                    logger.warning("Broadcast generation failed: %s", exc)
+                    return
+            checkpoint.append(type="generated", prompt=prompt, text=text)
+            report.generated += 1
+
+        pending = [prompt for prompt in recipients_by_prompt if prompt not in checkpoint.generated]
+        await asyncio.gather(*(_one(prompt) for prompt in pending))
+
+    async def _multicast(self, line_bot_api, to: List[str], text: str, retry_key: str) -> None:
+        delay = 1.0
+        for attempt in range(self._max_retries + 1):
+            wait = self._last_send + self._min_interval - time.monotonic()
+            if wait > 0:
+                await asyncio.sleep(wait)
+            self._last_send = time.monotonic()
+            try:
+                await asyncio.to_thread(
+                    line_bot_api.multicast,
+                    to,
+                    [TextSendMessage(text=text)],
+                    retry_key=retry_key,
+                )
+                return
+            except LineBotApiError as exc:
+                # 409 means LINE already accepted this retry_key.
+                if exc.status_code == 409:
+                    return
+                if _rejected(exc):
+                    raise
+                if attempt == self._max_retries:
+                    raise
+                retry_after = (exc.headers or {}).get("Retry-After")
+                await asyncio.sleep(float(retry_after) if retry_after else delay)
+                delay *= 2
+
+
+def _rejected(exc: LineBotApiError) -> bool:
+    """A 4xx that retrying will not fix (409 and 429 are handled separately)."""
+
+    return 400 <= exc.status_code < 500 and exc.status_code not in (409, 429)
+
+
+def _hash_text(text: str) -> str:
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()[:12]
+
+
+def _render(prompt_template: str, target: BroadcastTarget) -> str:
+    fields = {name for _, name, _, _ in Formatter().parse(prompt_template) if name}
+    values = {"user_id": target.user_id, **target.context}
+    return prompt_template.format(**{name: values.get(name, "") for name in fields})
@@ -0,0 +1,149 @@
+"""Model and endpoint routing for chat completion calls."""
+from __future__ import annotations
+
+import random
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence
+
+DEFAULT_ROUTE = "default"
+FAST_ROUTE = "fast"
+
+
+@dataclass
+class _Stats:
+    requests: int = 0
+    errors: int = 0
+    ewma_ms: Optional[float] = None
+    max_ms: float = 0.0
+    consecutive_failures: int = 0
+    cooldown_until: float = 0.0
+
+    def observe(self, latency_ms: float, ok: bool, alpha: float) -> None:
+        self.requests += 1
+        if ok:
+            self.consecutive_failures = 0
+            self.ewma_ms = (
+                latency_ms
+                if self.ewma_ms is None
+                else alpha * latency_ms + (1 - alpha) * self.ewma_ms
+            )
+            self.max_ms = max(self.max_ms, latency_ms)
+        else:
+            self.errors += 1
+            self.consecutive_failures += 1
+
+    def as_dict(self) -> Dict[str, object]:
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "error_rate": round(self.errors / self.requests, 4) if self.requests else 0.0,
+            "ewma_latency_ms": round(self.ewma_ms, 1) if self.ewma_ms is not None else None,
+            "max_latency_ms": round(self.max_ms, 1),
+        }
+
+
+@dataclass
+class Endpoint:
+    api_base: str
+    stats: _Stats = field(default_factory=_Stats)
+
+    @property
+    def url(self) -> str:
+        return f"{self.api_base}/chat/completions"
+
+
+class ChatRouter:
+    """Picks a model per message and orders endpoints by observed latency.
+
+    Endpoints are chosen at random weighted by ``1 / ewma_latency`` so slower
+    upstreams still get probed. After ``failure_threshold`` consecutive errors
+    an endpoint is skipped for ``cooldown`` seconds unless nothing else is left.
+    """
+
+    def __init__(
+        self,
+        api_bases: Sequence[str],
+        model: str,
+        fast_model: Optional[str] = None,
+        fast_max_chars: int = 20,
+        failure_threshold: int = 3,
+        cooldown: float = 30.0,
+        alpha: float = 0.3,
+    ) -> None:
+        if not api_bases:
+            raise ValueError("At least one chat completion endpoint is required")
+        self._endpoints = [Endpoint(api_base=base.rstrip("/")) for base in api_bases]
+        self._models = {DEFAULT_ROUTE: model}
+        if fast_model:
+            self._models[FAST_ROUTE] = fast_model
+        self._fast_max_chars = fast_max_chars
+        self._failure_threshold = failure_threshold
+        self._cooldown = cooldown
+        self._alpha = alpha
+        self._route_stats = {route: _Stats() for route in self._models}
+        self._lock = threading.Lock()
+        self._random = random.Random()
+
+    def choose_route(self, user_text: str, route: Optional[str] = None) -> str:
+        """Short casual messages go to the fast model when one is configured."""
+
+        if route in self._models:
+            return route
+        if FAST_ROUTE in self._models and len(user_text.strip()) <= self._fast_max_chars:
+            return FAST_ROUTE
+        return DEFAULT_ROUTE
+
+    def model_for(self, route: str) -> str:
+        return self._models[route]
+
+    def endpoints(self) -> List[Endpoint]:
+        """Return endpoints in the order they should be tried."""
+
+        now = time.monotonic()
+        with self._lock:
+            healthy = [e for e in self._endpoints if e.stats.cooldown_until <= now]
+            cooling = [e for e in self._endpoints if e.stats.cooldown_until > now]
+            known = [e.stats.ewma_ms for e in healthy if e.stats.ewma_ms is not None]
+            # Unmeasured endpoints are treated as the fastest so they get sampled.
+            floor = min(known) if known else 1.0
+            weights = [1.0 / max(e.stats.ewma_ms or floor, 1.0) for e in healthy]
+        ordered: List[Endpoint] = []
+        while healthy:
+            index = self._random.choices(range(len(healthy)), weights=weights)[0]
+            ordered.append(healthy.pop(index))
+            weights.pop(index)
+        cooling.sort(key=lambda e: e.stats.cooldown_until)
+        return ordered + cooling
+
+    def record_attempt(self, endpoint: Endpoint, latency_ms: float, ok: bool) -> None:
+        """Record a single HTTP attempt against ``endpoint``."""
+
+        with self._lock:
+            endpoint.stats.observe(latency_ms, ok, self._alpha)
+            if not ok and endpoint.stats.consecutive_failures >= self._failure_threshold:
+                endpoint.stats.cooldown_until = time.monotonic() + self._cooldown
+
+    def record_request(self, route: str, latency_ms: float, ok: bool) -> None:
+        """Record the end-to-end outcome of a request, failovers included."""
+
+        with self._lock:
+            self._route_stats[route].observe(latency_ms, ok, self._alpha)
+
+    def snapshot(self) -> Dict[str, object]:
+        now = time.monotonic()
+        with self._lock:
+            return {
+                "routes": {
+                    route: {"model": self._models[route], **stats.as_dict()}
+                    for route, stats in self._route_stats.items()
+                },
+                "endpoints": {
+                    endpoint.api_base: {
+                        **endpoint.stats.as_dict(),
+                        "cooling_down": endpoint.stats.cooldown_until > now,
+                    }
+                    for endpoint in self._endpoints
+                },
+            }
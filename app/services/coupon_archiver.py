@@ -0,0 +1,125 @@
+"""Background job moving expired and redeemed coupons out of the hot table."""
+from __future__ import annotations
+
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from typing import Dict
+
+from sqlalchemy import and_, delete, insert, or_, select, tuple_
+from sqlalchemy.orm import sessionmaker
+
+from database.models import Coupon, CouponArchive, CouponRedemption, CouponStatus
+
+logger = logging.getLogger(__name__)
+
+ARCHIVED_COLUMNS = (
+    "id",
+    "user_id",
+    "type",
+    "code",
+    "title",
+    "description",
+    "status",
+    "expires_at",
+    "redeemed_at",
+    "created_at",
+)
+
+
+class CouponArchiver:
+    """Archives (or purges) finished coupons in small, short transactions.
+
+    Each batch locks at most ``batch_size`` rows with ``SKIP LOCKED`` and
+    commits before the next one, so concurrent workers can run the job and
+    user traffic never waits behind a long lock.
+    """
+
+    def __init__(
+        self,
+        session_factory: sessionmaker,
+        batch_size: int = 500,
+        max_batches: int = 100,
+        redeemed_retention: timedelta = timedelta(days=30),
+        expired_grace: timedelta = timedelta(days=7),
+        purge: bool = False,
+    ) -> None:
+        self._session_factory = session_factory
+        self._batch_size = batch_size
+        self._max_batches = max_batches
+        self._redeemed_retention = redeemed_retention
+        self._expired_grace = expired_grace
+        self._purge = purge
+
+    def run_once(self) -> Dict[str, int]:
+        now = datetime.utcnow()
+        stats = {"coupons": 0, "redemption_keys": 0}
+        for _ in range(self._max_batches):
+            moved = self._archive_batch(now)
+            stats["coupons"] += moved
+            if moved < self._batch_size:
+                break
+        for _ in range(self._max_batches):
+            removed = self._purge_redemption_batch(now)
+            stats["redemption_keys"] += removed
+            if removed < self._batch_size:
+                break
+        return stats
+
+    def _archive_batch(self, now: datetime) -> int:
+        finished = or_(
+            and_(
+                Coupon.status == CouponStatus.redeemed,
+                Coupon.redeemed_at < now - self._redeemed_retention,
+            ),
+            Coupon.expires_at < now - self._expired_grace,
+        )
+        with self._session_factory() as session:
+            ids = session.scalars(
+                select(Coupon.id)
+                .where(finished)
+                .limit(self._batch_size)
+                .with_for_update(skip_locked=True)
+            ).all()
+            if not ids:
+                return 0
+            if not self._purge:
+                columns = [getattr(Coupon, name) for name in ARCHIVED_COLUMNS]
+                session.execute(
+                    insert(CouponArchive).from_select(
+                        list(ARCHIVED_COLUMNS), select(*columns).where(Coupon.id.in_(ids))
+                    )
+                )
+            session.execute(delete(Coupon).where(Coupon.id.in_(ids)))
+            session.commit()
+            return len(ids)
+
+    def _purge_redemption_batch(self, now: datetime) -> int:
+        # Idempotency keys only need to outlive client retries.
+        with self._session_factory() as session:
+            keys = session.execute(
+                select(CouponRedemption.user_id, CouponRedemption.idempotency_key)
+                .where(CouponRedemption.redeemed_at < now - self._redeemed_retention)
+                .limit(self._batch_size)
+            ).all()
+            if not keys:
+                return 0
+            session.execute(
+                delete(CouponRedemption).where(
+                    tuple_(CouponRedemption.user_id, CouponRedemption.idempotency_key).in_(
+                        [tuple(key) for key in keys]
+                    )
+                )
+            )
+            session.commit()
+            return len(keys)
+
+    async def run_forever(self, interval: float) -> None:
+        while True:
+            try:
+                stats = await asyncio.to_thread(self.run_once)
+                if any(stats.values()):
+                    logger.info("Coupon archival: %s", stats)
+            except Exception:  # keep the loop alive; next run retries
+                logger.exception("Coupon archival failed")
+            await asyncio.sleep(interval)
@@ -1,13 +1,37 @@
 """Service that manages coupons earned from games with Cony."""
 from __future__ import annotations
 
-from typing import Dict, List
+import hashlib
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional
 from uuid import uuid4
 
-from sqlalchemy import select
+from sqlalchemy import or_, select, update
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
-from database.models import AppUser, Coupon, CouponType
+from app.schemas import CouponOut
+from database.models import AppUser, Coupon, CouponRedemption, CouponStatus, CouponType
+from database.session import READ_REPLICA_OPTION
+
+CONSUMED = "consumed"
+NOT_FOUND = "not_found"
+# The idempotency key was already used to redeem a different coupon.
+KEY_CONFLICT = "key_conflict"
+
+
+def _coupon_out(code: str, title: str, description: Optional[str], type_: CouponType) -> CouponOut:
+    return CouponOut.model_construct(
+        id=code,
+        title=title,
+        description=description or "",
+        source="game" if type_ == CouponType.game else "catalog",
+    )
+
+
+def _derived_key(idempotency_key: str, code: str) -> str:
+    return hashlib.sha256(f"{idempotency_key}:{code}".encode("utf-8")).hexdigest()
+
 
 class CouponService:
     """Provides Postgres-backed coupon operations."""
@@ -16,9 +40,13 @@ class CouponService:
         self,
         session: Session,
         default_user_id: str = "demo-user",
+        game_coupon_ttl: Optional[timedelta] = None,
+        list_window: Optional[timedelta] = None,
     ) -> None:
         self._session = session
         self._user_id = default_user_id
+        self._game_coupon_ttl = game_coupon_ttl
+        self._list_window = list_window
         self._ensure_user_exists()
 
     def _ensure_user_exists(self) -> None:
@@ -28,52 +56,129 @@ class CouponService:
             self._session.add(user)
             self._session.commit()
 
-    def list_coupons(self) -> List[Dict[str, str]]:
-        """Return all coupons for the default user."""
+    def _active(self, now: datetime) -> tuple:
+        return (
+            Coupon.user_id == self._user_id,
+            Coupon.status == CouponStatus.active,
+            or_(Coupon.expires_at.is_(None), Coupon.expires_at > now),
+        )
+
+    def list_coupons(self) -> List[CouponOut]:
+        """Return the default user's active, unexpired coupons.
 
-        coupons = self._session.scalars(
-            select(Coupon).where(Coupon.user_id == self._user_id).order_by(Coupon.created_at.desc())
-        ).all()
-        results: List[Dict[str, str]] = []
-        for coupon in coupons:
-            results.append(
-                {
-                    "id": coupon.code,
-                    "title": coupon.title,
-                    "description": coupon.description or "",
-                    "source": "game" if coupon.type == CouponType.game else "catalog",
-                }
-            )
-        return results
+        With ``list_window`` set, only coupons created within it are listed;
+        the ``created_at`` bound lets Postgres skip older monthly partitions.
+        """
 
-    def add_coupon(self, title: str, description: str) -> Dict[str, str]:
+        now = datetime.utcnow()
+        query = (
+            select(Coupon.code, Coupon.title, Coupon.description, Coupon.type)
+            .where(*self._active(now))
+            .order_by(Coupon.created_at.desc())
+            .execution_options(**{READ_REPLICA_OPTION: True})
+        )
+        if self._list_window is not None:
+            query = query.where(Coupon.created_at >= now - self._list_window)
+        # Plain column rows skip ORM identity-map bookkeeping; the values come
+        # from our own schema, so the DTOs are built without validation.
+        rows = self._session.execute(query)
+        return [_coupon_out(*row) for row in rows]
+
+    def add_coupon(self, title: str, description: str) -> CouponOut:
         """Create and store a new coupon when players win games."""
 
         code = f"CONY-{uuid4().hex[:8].upper()}"
+        expires_at = datetime.utcnow() + self._game_coupon_ttl if self._game_coupon_ttl else None
         coupon = Coupon(
             user_id=self._user_id,
             type=CouponType.game,
             code=code,
             title=title,
             description=description,
+            expires_at=expires_at,
         )
         self._session.add(coupon)
         self._session.commit()
+        return _coupon_out(coupon.code, coupon.title, coupon.description, coupon.type)
+
+    def consume_coupon(self, code: str, idempotency_key: Optional[str] = None) -> str:
+        """Mark a coupon as redeemed once the user confirms usage.
+
+        Returns ``CONSUMED``, ``NOT_FOUND`` or ``KEY_CONFLICT``. Retrying with
+        the same ``idempotency_key`` reports ``CONSUMED`` again; reusing the key
+        for a different code reports ``KEY_CONFLICT``.
+        """
+
+        keys = {code: idempotency_key} if idempotency_key else None
+        return self._redeem([code], keys)[code]
+
+    def consume_coupons(
+        self, codes: Iterable[str], idempotency_key: Optional[str] = None
+    ) -> List[Dict[str, str]]:
+        """Redeem a batch of coupons in one transaction, reporting each code.
+
+        Each code's idempotency key is derived from ``"<key>:<code>"`` (hashed,
+        so it always fits the 128-character column).
+        """
+
+        unique_codes = list(dict.fromkeys(codes))
+        keys = (
+            {code: _derived_key(idempotency_key, code) for code in unique_codes}
+            if idempotency_key
+            else None
+        )
+        statuses = self._redeem(unique_codes, keys)
+        return [{"code": code, "status": statuses[code]} for code in unique_codes]
+
+    def _replayed(self, keys: Dict[str, str]) -> Dict[str, str]:
+        """Status of each code whose key was already used, by the stored code."""
+
+        rows = self._session.execute(
+            select(CouponRedemption.idempotency_key, CouponRedemption.code).where(
+                CouponRedemption.user_id == self._user_id,
+                CouponRedemption.idempotency_key.in_(list(keys.values())),
+            )
+        )
+        stored = dict(rows.all())
         return {
-            "id": coupon.code,
-            "title": coupon.title,
-            "description": coupon.description or "",
-            "source": "game",
+            code: CONSUMED if stored[key] == code else KEY_CONFLICT
+            for code, key in keys.items()
+            if key in stored
         }
 
-    def consume_coupon(self, code: str) -> bool:
-        """Delete a coupon once the user confirms usage."""
+    def _redeem(self, codes: List[str], keys: Optional[Dict[str, str]]) -> Dict[str, str]:
+        statuses = {code: NOT_FOUND for code in codes}
+        if keys:
+            statuses.update(self._replayed(keys))
+        pending = [code for code in codes if statuses[code] == NOT_FOUND]
+        if not pending:
+            return statuses
 
-        coupon = self._session.scalar(
-            select(Coupon).where(Coupon.user_id == self._user_id, Coupon.code == code)
-        )
-        if not coupon:
-            return False
-        self._session.delete(coupon)
-        self._session.commit()
-        return True
+        # Single UPDATE ... RETURNING: concurrent redemptions of the same code
+        # serialize on the row and only one of them still sees it active.
+        now = datetime.utcnow()
+        redeemed = self._session.scalars(
+            update(Coupon)
+            .where(*self._active(now), Coupon.code.in_(pending))
+            .values(status=CouponStatus.redeemed, redeemed_at=now)
+            .returning(Coupon.code)
+            .execution_options(synchronize_session=False)
+        ).all()
+        if keys:
+            self._session.add_all(
+                CouponRedemption(user_id=self._user_id, idempotency_key=keys[code], code=code)
+                for code in redeemed
+            )
+        try:
+            self._session.commit()
+        except IntegrityError:
+            # A concurrent retry with the same key won; our update is rolled back.
+            self._session.rollback()
+            redeemed = []
+        for code in redeemed:
+            statuses[code] = CONSUMED
+        if keys and len(redeemed) < len(pending):
+            # Lost a race against a request with the same key that already committed.
+            missing = {code: keys[code] for code in pending if code not in redeemed}
+            statuses.update(self._replayed(missing))
+        return statuses
@@ -0,0 +1,275 @@
+"""Local FAQ retrieval used to ground @客戶服務 answers."""
+from __future__ import annotations
+
+import fcntl
+import json
+import logging
+import os
+import threading
+import zlib
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, List, Sequence
+from uuid import uuid4
+
+import numpy as np
+
+from app.services.file_watch import FileWatch
+
+logger = logging.getLogger(__name__)
+
+DATA_DIR = Path(__file__).resolve().parent.parent.parent / "data"
+FAQ_PATH = DATA_DIR / "faq.json"
+FAQ_INDEX_DIR = DATA_DIR / "faq_index"
+VECTORS_SUFFIX = ".f32"
+META_FILE = "meta.json"
+LOCK_FILE = ".build.lock"
+
+
+@dataclass
+class FaqHit:
+    question: str
+    answer: str
+    score: float
+
+
+def _tokens(text: str) -> List[str]:
+    """Character unigrams + bigrams; works for Chinese without a segmenter."""
+
+    chars = [char for char in text.lower() if not char.isspace()]
+    return chars + [a + b for a, b in zip(chars, chars[1:])]
+
+
+class HashingVectorizer:
+    """Signed feature hashing with optional IDF weights and L2 normalization."""
+
+    def __init__(self, dim: int = 512, idf: np.ndarray | None = None) -> None:
+        self.dim = dim
+        self.idf = idf
+
+    def _hashed(self, text: str) -> Dict[int, float]:
+        counts: Dict[int, float] = {}
+        for token in _tokens(text):
+            # crc32 is stable across processes, unlike hash().
+            digest = zlib.crc32(token.encode("utf-8"))
+            index = digest % self.dim
+            sign = 1.0 if digest & 0x80000000 else -1.0
+            counts[index] = counts.get(index, 0.0) + sign
+        return counts
+
+    def transform(self, texts: Sequence[str]) -> np.ndarray:
+        matrix = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for index, value in self._hashed(text).items():
+                matrix[row, index] = value
+        if self.idf is not None:
+            matrix *= self.idf
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        np.divide(matrix, norms, out=matrix, where=norms > 0)
+        return matrix
+
+    def fit_idf(self, texts: Iterable[str]) -> np.ndarray:
+        doc_freq = np.zeros(self.dim, dtype=np.float64)
+        total = 0
+        for text in texts:
+            doc_freq[list(self._hashed(text))] += 1
+            total += 1
+        self.idf = (np.log((1 + total) / (1 + doc_freq)) + 1).astype(np.float32)
+        return self.idf
+
+
+def _passage(entry: dict) -> str:
+    return f"{entry.get('question', '')} {entry.get('answer', '')}"
+
+
+@contextmanager
+def _build_lock(index_dir: Path):
+    """Serialize index builds across workers sharing ``index_dir``."""
+
+    index_dir.mkdir(parents=True, exist_ok=True)
+    with open(index_dir / LOCK_FILE, "w") as handle:
+        fcntl.flock(handle, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(handle, fcntl.LOCK_UN)
+
+
+def _read_meta(index_dir: Path, corpus_mtime_ns: int, dim: int) -> dict | None:
+    try:
+        meta = json.loads((index_dir / META_FILE).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+    if (
+        meta.get("corpus_mtime_ns") != corpus_mtime_ns
+        or meta.get("dim") != dim
+        or not (index_dir / meta.get("vectors", "")).is_file()
+    ):
+        return None
+    return meta
+
+
+def build_index(corpus_path: Path = FAQ_PATH, index_dir: Path = FAQ_INDEX_DIR, dim: int = 512) -> dict:
+    """Vectorize the FAQ corpus into a memory-mappable float32 matrix.
+
+    Vectors go to a new, uniquely named file and ``meta.json`` is swapped in
+    atomically, so workers that still map the previous file are unaffected.
+    Call with the build lock held (see ``ensure_index``).
+    """
+
+    corpus_mtime_ns = corpus_path.stat().st_mtime_ns
+    entries = json.loads(corpus_path.read_text(encoding="utf-8"))
+    passages = [_passage(entry) for entry in entries]
+    vectorizer = HashingVectorizer(dim)
+    idf = vectorizer.fit_idf(passages)
+    index_dir.mkdir(parents=True, exist_ok=True)
+    vectors_name = f"vectors-{uuid4().hex[:12]}{VECTORS_SUFFIX}"
+    vectors = np.memmap(
+        index_dir / vectors_name, dtype=np.float32, mode="w+", shape=(max(len(passages), 1), dim)
+    )
+    batch = 4096
+    for start in range(0, len(passages), batch):
+        vectors[start : start + batch] = vectorizer.transform(passages[start : start + batch])
+    vectors.flush()
+    del vectors
+    meta = {
+        "dim": dim,
+        "count": len(passages),
+        "corpus_mtime_ns": corpus_mtime_ns,
+        "vectors": vectors_name,
+        "idf": idf.tolist(),
+    }
+    tmp_meta = index_dir / f"{META_FILE}.{os.getpid()}.tmp"
+    tmp_meta.write_text(json.dumps(meta), encoding="utf-8")
+    os.replace(tmp_meta, index_dir / META_FILE)
+    # Open memmaps keep unlinked files alive, so old vectors can go right away.
+    for path in index_dir.glob(f"*{VECTORS_SUFFIX}"):
+        if path.name != vectors_name:
+            path.unlink(missing_ok=True)
+    return meta
+
+
+def ensure_index(corpus_path: Path = FAQ_PATH, index_dir: Path = FAQ_INDEX_DIR, dim: int = 512) -> dict:
+    """Return metadata of an index matching the corpus, building it if needed."""
+
+    corpus_mtime_ns = corpus_path.stat().st_mtime_ns
+    meta = _read_meta(index_dir, corpus_mtime_ns, dim)
+    if meta is not None:
+        return meta
+    with _build_lock(index_dir):
+        # Another worker may have finished the build while we waited.
+        meta = _read_meta(index_dir, corpus_mtime_ns, dim)
+        return meta if meta is not None else build_index(corpus_path, index_dir, dim)
+
+
+@dataclass
+class _Index:
+    entries: list
+    vectorizer: HashingVectorizer
+    matrix: np.ndarray
+    corpus_mtime_ns: int
+
+
+class FaqRetriever:
+    """Top-k cosine similarity over a memory-mapped FAQ matrix.
+
+    The corpus mtime is re-checked at most every ``check_interval`` seconds;
+    when it changed, the index is rebuilt in a background thread and swapped
+    in, while searches keep using the previous one.
+    """
+
+    def __init__(
+        self,
+        corpus_path: str | Path = FAQ_PATH,
+        index_dir: str | Path = FAQ_INDEX_DIR,
+        dim: int = 512,
+        min_score: float = 0.15,
+        check_interval: float = 5.0,
+    ) -> None:
+        self._corpus_path = Path(corpus_path)
+        self._index_dir = Path(index_dir)
+        self._dim = dim
+        self._min_score = min_score
+        self._refreshing = False
+        self._index = self._load()
+        self._watch = FileWatch(self._corpus_path, check_interval, self._index.corpus_mtime_ns)
+
+    def __len__(self) -> int:
+        return len(self._index.entries)
+
+    def _load(self) -> _Index:
+        meta = ensure_index(self._corpus_path, self._index_dir, self._dim)
+        entries = json.loads(self._corpus_path.read_text(encoding="utf-8"))
+        if len(entries) != meta["count"]:
+            raise ValueError("FAQ corpus changed while loading its index")
+        matrix = np.memmap(
+            self._index_dir / meta["vectors"],
+            dtype=np.float32,
+            mode="r",
+            shape=(max(meta["count"], 1), meta["dim"]),
+        )[: meta["count"]]
+        vectorizer = HashingVectorizer(meta["dim"], np.asarray(meta["idf"], dtype=np.float32))
+        return _Index(entries, vectorizer, matrix, meta["corpus_mtime_ns"])
+
+    def _refresh(self) -> None:
+        try:
+            self._index = self._load()
+            logger.info("Reloaded FAQ index (%d entries)", len(self._index.entries))
+        except (OSError, ValueError) as exc:
+            # Keep serving the previous index; the next check retries.
+            logger.warning("FAQ index reload failed: %s", exc)
+            self._watch.invalidate()
+        finally:
+            self._refreshing = False
+
+    def _maybe_refresh(self) -> None:
+        # A change seen mid-rebuild is left for the next check to report.
+        if self._refreshing or not self._watch.poll():
+            return
+        if not self._watch.exists:
+            # Keep the last index while the corpus is missing.
+            return
+        self._refreshing = True
+        threading.Thread(target=self._refresh, name="faq-index-refresh", daemon=True).start()
+
+    def search_batch(self, queries: Sequence[str], k: int = 3) -> List[List[FaqHit]]:
+        """Return the top ``k`` passages for each query with one matrix product."""
+
+        self._maybe_refresh()
+        index = self._index
+        if not len(index.entries) or not queries:
+            return [[] for _ in queries]
+        scores = index.vectorizer.transform(queries) @ index.matrix.T
+        k = min(k, scores.shape[1])
+        top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        results: List[List[FaqHit]] = []
+        for row, candidates in enumerate(top):
+            ordered = candidates[np.argsort(-scores[row, candidates])]
+            results.append(
+                [
+                    FaqHit(
+                        question=index.entries[i].get("question", ""),
+                        answer=index.entries[i].get("answer", ""),
+                        score=float(scores[row, i]),
+                    )
+                    for i in ordered
+                    if scores[row, i] >= self._min_score
+                ]
+            )
+        return results
+
+    def search(self, query: str, k: int = 3) -> List[FaqHit]:
+        return self.search_batch([query], k)[0]
+
+
+def load_retriever(corpus_path: Path = FAQ_PATH) -> FaqRetriever | None:
+    """Build the default retriever, or ``None`` when there is no FAQ corpus."""
+
+    if not corpus_path.exists():
+        return None
+    try:
+        return FaqRetriever(corpus_path)
+    except (OSError, ValueError) as exc:
+        logger.warning("FAQ retrieval disabled: %s", exc)
+        return None
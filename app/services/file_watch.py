@@ -0,0 +1,62 @@
+"""Cheap change detection for config files that are reloaded while serving."""
+from __future__ import annotations
+
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+
+_UNSEEN = -1
+
+
+class FileWatch:
+    """Reports when a file's mtime changes, stat-ing it at most every ``check_interval``.
+
+    Each change is reported to exactly one caller of ``poll``, so concurrent
+    requests do not all reload the same edit. The caller reloads the file
+    itself and, if several reloads can overlap, serializes them.
+    """
+
+    def __init__(
+        self,
+        path: str | Path,
+        check_interval: float = 2.0,
+        mtime_ns: Optional[int] = _UNSEEN,
+    ) -> None:
+        self.path = Path(path)
+        self._check_interval = check_interval
+        self._lock = threading.Lock()
+        self._next_check = 0.0 if mtime_ns == _UNSEEN else time.monotonic() + check_interval
+        self.mtime_ns = mtime_ns
+
+    @property
+    def exists(self) -> bool:
+        """Whether the file existed at the last reported change."""
+
+        return self.mtime_ns is not None
+
+    def poll(self, force: bool = False) -> bool:
+        """Return ``True`` if the file changed, appeared or vanished since the last change."""
+
+        now = time.monotonic()
+        if not force and now < self._next_check:
+            return False
+        with self._lock:
+            if not force and now < self._next_check:
+                return False
+            self._next_check = now + self._check_interval
+            try:
+                mtime_ns: Optional[int] = os.stat(self.path).st_mtime_ns
+            except FileNotFoundError:
+                mtime_ns = None
+            if mtime_ns == self.mtime_ns:
+                return False
+            self.mtime_ns = mtime_ns
+            return True
+
+    def invalidate(self) -> None:
+        """Report the current file as changed again on the next check (retry a failed load)."""
+
+        with self._lock:
+            self.mtime_ns = _UNSEEN
@@ -3,9 +3,11 @@ from __future__ import annotations
 
 import random
 from dataclasses import dataclass
-from typing import Dict
+from typing import Optional
 
+from app.schemas import Reward
 from app.services.coupon_service import CouponService
+from app.services.reward_inventory import GRANTED, SOLD_OUT, RewardGate
 
 CHOICES = (
     "carrot",
@@ -22,14 +24,19 @@ class GameResult:
     player_choice: str
     cony_choice: str
     did_win: bool
-    reward: Dict[str, object]
+    reward: Reward
 
 
 class GameService:
     """Simple guessing game service used by the /play-with-cony endpoint."""
 
-    def __init__(self, coupon_service: CouponService) -> None:
+    def __init__(
+        self,
+        coupon_service: CouponService,
+        reward_gate: Optional[RewardGate] = None,
+    ) -> None:
         self._coupon_service = coupon_service
+        self._reward_gate = reward_gate
 
     def play_round(self, player_choice: str) -> GameResult:
         """Players win if they guess the same treat Cony secretly picked."""
@@ -40,22 +47,35 @@ class GameService:
 
         cony_choice = random.choice(CHOICES)
         did_win = normalized_choice == cony_choice
-        if did_win:
+        claim = GRANTED
+        if did_win and self._reward_gate is not None:
+            claim = self._reward_gate.claim()
+        if did_win and claim != GRANTED:
+            reward = Reward(
+                message=(
+                    "You won, but today's coupons are all gone. Come back tomorrow!"
+                    if claim == SOLD_OUT
+                    else "You won, but you've collected today's maximum coupons. See you tomorrow!"
+                ),
+                coupons=self._coupon_service.list_coupons(),
+                new_coupon=None,
+            )
+        elif did_win:
             new_coupon = self._coupon_service.add_coupon(
                 title="Cony粉紅9折券",
                 description="贏得遊戲即可享受全品項9折優惠。",
             )
-            reward = {
-                "message": "Congrats! Here are all your coupons.",
-                "coupons": self._coupon_service.list_coupons(),
-                "new_coupon": new_coupon,
-            }
+            reward = Reward(
+                message="Congrats! Here are all your coupons.",
+                coupons=self._coupon_service.list_coupons(),
+                new_coupon=new_coupon,
+            )
         else:
-            reward = {
-                "message": "Nice try! Win to collect coupons.",
-                "coupons": [],
-                "new_coupon": None,
-            }
+            reward = Reward(
+                message="Nice try! Win to collect coupons.",
+                coupons=[],
+                new_coupon=None,
+            )
         return GameResult(
             player_choice=normalized_choice,
             cony_choice=cony_choice,
@@ -0,0 +1,188 @@
+"""Data-driven keyword rules for LINE messages, compiled into one matcher."""
+from __future__ import annotations
+
+import json
+import logging
+import threading
+from collections import deque
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from app.services.file_watch import FileWatch
+
+logger = logging.getLogger(__name__)
+
+HANDLERS = ("prefix", "append")
+EMPTY_PROMPT = "請主動詢問客戶需求並提供協助。"
+
+
+@dataclass(frozen=True)
+class KeywordRule:
+    keywords: Tuple[str, ...]
+    instruction: str
+    handler: str = "prefix"
+    priority: int = 0
+    name: str = ""
+    # Ground the answer with FAQ passages (see faq_retriever).
+    retrieval: bool = False
+
+    def strip_keywords(self, content: str) -> str:
+        for keyword in self.keywords:
+            content = content.replace(keyword, "")
+        return content.strip()
+
+    def apply(self, content: str) -> str:
+        """Rewrite the user message according to this rule's handler."""
+
+        if self.handler == "append":
+            return f"{content}\n{self.instruction}"
+        content = self.strip_keywords(content) or EMPTY_PROMPT
+        return f"{self.instruction}{content}"
+
+
+class KeywordMatcher:
+    """Aho-Corasick automaton returning the highest-priority matching rule.
+
+    Matching cost depends on the message length, not on the number of rules.
+    """
+
+    def __init__(self, rules: Sequence[KeywordRule]) -> None:
+        self._rules = list(rules)
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        # Best (priority, -rule_index) reachable from each state, fail links included.
+        self._best: List[Optional[Tuple[int, int]]] = [None]
+        for index, rule in enumerate(self._rules):
+            for keyword in rule.keywords:
+                if keyword:
+                    self._insert(keyword, (rule.priority, -index))
+        self._link()
+
+    def __len__(self) -> int:
+        return len(self._rules)
+
+    def _insert(self, keyword: str, rank: Tuple[int, int]) -> None:
+        state = 0
+        for char in keyword:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto.append({})
+                self._fail.append(0)
+                self._best.append(None)
+                self._goto[state][char] = next_state
+            state = next_state
+        current = self._best[state]
+        if current is None or rank > current:
+            self._best[state] = rank
+
+    def _link(self) -> None:
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(char, 0)
+                self._fail[next_state] = target if target != next_state else 0
+                inherited = self._best[self._fail[next_state]]
+                own = self._best[next_state]
+                if inherited is not None and (own is None or inherited > own):
+                    self._best[next_state] = inherited
+
+    def match(self, text: str) -> Optional[KeywordRule]:
+        """Return the highest-priority rule whose keyword appears in ``text``."""
+
+        goto = self._goto
+        fail = self._fail
+        best_table = self._best
+        state = 0
+        best: Optional[Tuple[int, int]] = None
+        for char in text:
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            rank = best_table[state]
+            if rank is not None and (best is None or rank > best):
+                best = rank
+        if best is None:
+            return None
+        return self._rules[-best[1]]
+
+
+def parse_rules(raw: Iterable[dict]) -> List[KeywordRule]:
+    """Validate rule dictionaries loaded from the rules file."""
+
+    if not isinstance(raw, list):
+        raise ValueError("Keyword rules must be a JSON list of rule objects")
+    rules: List[KeywordRule] = []
+    for index, item in enumerate(raw):
+        if not isinstance(item, dict):
+            raise ValueError(f"Rule #{index} must be an object")
+        keywords = item["keywords"] if "keywords" in item else [item.get("keyword", "")]
+        if not isinstance(keywords, list) or not all(isinstance(k, str) for k in keywords):
+            raise ValueError(f"Rule #{index} keywords must be a list of strings")
+        keywords = tuple(keyword for keyword in keywords if keyword)
+        handler = item.get("handler", "prefix")
+        if not keywords:
+            raise ValueError(f"Rule #{index} has no keywords")
+        if handler not in HANDLERS:
+            raise ValueError(f"Rule #{index} handler must be one of {', '.join(HANDLERS)}")
+        priority = item.get("priority", 0)
+        if isinstance(priority, bool) or not isinstance(priority, int):
+            raise ValueError(f"Rule #{index} priority must be an integer")
+        instruction = item.get("instruction", "")
+        if not isinstance(instruction, str):
+            raise ValueError(f"Rule #{index} instruction must be a string")
+        rules.append(
+            KeywordRule(
+                keywords=keywords,
+                instruction=instruction,
+                handler=handler,
+                priority=priority,
+                name=str(item.get("name") or keywords[0]),
+                retrieval=bool(item.get("retrieval", False)),
+            )
+        )
+    return rules
+
+
+class KeywordRouter:
+    """Loads keyword rules from a JSON file and reloads them when it changes."""
+
+    def __init__(
+        self,
+        rules_path: str | Path,
+        fallback_rules: Sequence[KeywordRule] = (),
+        check_interval: float = 2.0,
+    ) -> None:
+        self._rules_path = Path(rules_path)
+        self._fallback_rules = list(fallback_rules)
+        self._watch = FileWatch(self._rules_path, check_interval)
+        self._lock = threading.Lock()
+        self._matcher = KeywordMatcher(self._fallback_rules)
+        self._maybe_reload(force=True)
+
+    def _maybe_reload(self, force: bool = False) -> None:
+        if not self._watch.poll(force):
+            return
+        with self._lock:
+            if not self._watch.exists:
+                self._matcher = KeywordMatcher(self._fallback_rules)
+                return
+            try:
+                raw = json.loads(self._rules_path.read_text(encoding="utf-8"))
+                matcher = KeywordMatcher(parse_rules(raw))
+            except (OSError, ValueError, TypeError, AttributeError) as exc:
+                # Keep serving the previous rules when an edit is broken.
+                logger.warning("Ignoring invalid keyword rules in %s: %s", self._rules_path, exc)
+                return
+            self._matcher = matcher
+            logger.info("Loaded %d keyword rules from %s", len(matcher), self._rules_path)
+
+    def match(self, text: str) -> Optional[KeywordRule]:
+        self._maybe_reload()
+        return self._matcher.match(text)
@@ -0,0 +1,217 @@
+"""Serve several LINE Official Accounts from one process."""
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+from linebot import WebhookParser
+
+from app.services.file_watch import FileWatch
+from app.services.line_chat_service import LineChatService
+from app.services.line_delivery import DeliveryStats, LineDelivery
+from app.services.template_responder import ResponseStats
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHANNEL = "default"
+
+
+@dataclass(frozen=True)
+class ChannelConfig:
+    name: str
+    channel_secret: str
+    access_token: str
+    persona_path: Optional[Path] = None
+    keywords_path: Optional[Path] = None
+    template_intents: Optional[Tuple[str, ...]] = None
+
+
+@dataclass
+class LineChannel:
+    """Everything needed to answer one channel's webhooks, built once."""
+
+    config: ChannelConfig
+    parser: WebhookParser
+    chat_service: LineChatService
+    delivery: LineDelivery
+
+    @property
+    def name(self) -> str:
+        return self.config.name
+
+
+def _secret(item: dict, field: str) -> str:
+    """Read ``field`` directly or from the env var named by ``<field>_env``."""
+
+    if item.get(field):
+        return item[field]
+    env_name = item.get(f"{field}_env")
+    value = os.environ.get(env_name, "") if env_name else ""
+    if not value:
+        raise ValueError(f"missing {field} (or {field}_env)")
+    return value
+
+
+def parse_channels(raw: dict, base_dir: Path) -> Dict[str, ChannelConfig]:
+    """Validate the channels file; broken entries are skipped with a warning.
+
+    Relative ``persona_path``/``keywords_path`` resolve against ``base_dir``.
+    """
+
+    if not isinstance(raw, dict):
+        raise ValueError("Channels file must be a JSON object keyed by channel name")
+    configs: Dict[str, ChannelConfig] = {}
+    for name, item in raw.items():
+        if name == DEFAULT_CHANNEL:
+            logger.warning("Ignoring channel %r: it is configured through LINE_CHANNEL_*", name)
+            continue
+        try:
+            intents = item.get("template_intents")
+            configs[name] = ChannelConfig(
+                name=name,
+                channel_secret=_secret(item, "channel_secret"),
+                access_token=_secret(item, "access_token"),
+                persona_path=base_dir / item["persona_path"] if item.get("persona_path") else None,
+                keywords_path=base_dir / item["keywords_path"] if item.get("keywords_path") else None,
+                template_intents=tuple(intents) if intents is not None else None,
+            )
+        except (AttributeError, TypeError, ValueError) as exc:
+            logger.warning("Ignoring LINE channel %r: %s", name, exc)
+    return configs
+
+
+@dataclass
+class ChannelStats:
+    """Per-channel counters; kept by the registry across rebuilds and evictions."""
+
+    replies: ResponseStats = field(default_factory=ResponseStats)
+    delivery: DeliveryStats = field(default_factory=DeliveryStats)
+
+
+class LineChannelRegistry:
+    """Bounded LRU cache of per-channel parsers, clients and chat services.
+
+    Channel configs come from a JSON file that is re-read when it changes
+    (checked at most every ``check_interval`` seconds). A channel whose config
+    changed is rebuilt on its next webhook; removed channels are dropped.
+    The default channel is pinned and never evicted. Builds run in a worker
+    thread (see ``resolve``), one at a time per channel.
+    """
+
+    def __init__(
+        self,
+        config_path: str | Path | None,
+        factory: Callable[[ChannelConfig, ChannelStats], LineChannel],
+        default: LineChannel,
+        max_channels: int = 32,
+        check_interval: float = 2.0,
+    ) -> None:
+        self._config_path = Path(config_path) if config_path else None
+        self._watch = FileWatch(self._config_path, check_interval) if self._config_path else None
+        self._factory = factory
+        self._default = default
+        self._max_channels = max(1, max_channels)
+        self._lock = threading.Lock()
+        self._build_locks: Dict[str, threading.Lock] = {}
+        self._configs: Dict[str, ChannelConfig] = {}
+        self._channels: "OrderedDict[str, LineChannel]" = OrderedDict()
+        self._stats: Dict[str, ChannelStats] = {
+            DEFAULT_CHANNEL: ChannelStats(default.chat_service.stats, default.delivery.counters)
+        }
+        self._builds = 0
+        self._evictions = 0
+        self._maybe_reload(force=True)
+
+    def _set_configs(self, configs: Dict[str, ChannelConfig]) -> None:
+        # Call with self._lock held.
+        self._configs = configs
+        stale = [
+            name for name, channel in self._channels.items() if configs.get(name) != channel.config
+        ]
+        for name in stale:
+            del self._channels[name]
+        # Counters survive rebuilds; only channels removed from the file lose them.
+        removed = [name for name in self._stats if name != DEFAULT_CHANNEL and name not in configs]
+        for name in removed:
+            del self._stats[name]
+
+    def _maybe_reload(self, force: bool = False) -> None:
+        if self._watch is None or not self._watch.poll(force):
+            return
+        with self._lock:
+            if not self._watch.exists:
+                self._set_configs({})
+                return
+            try:
+                raw = json.loads(self._config_path.read_text(encoding="utf-8"))
+                configs = parse_channels(raw, self._config_path.parent)
+            except (OSError, ValueError) as exc:
+                # Keep serving the previous channels when an edit is broken.
+                logger.warning("Ignoring invalid LINE channels in %s: %s", self._config_path, exc)
+                return
+            self._set_configs(configs)
+            logger.info("Loaded %d LINE channels from %s", len(configs), self._config_path)
+
+    def _cached(self, name: str) -> Tuple[Optional[LineChannel], Optional[ChannelConfig]]:
+        with self._lock:
+            channel = self._channels.get(name)
+            if channel is not None:
+                self._channels.move_to_end(name)
+                return channel, channel.config
+            return None, self._configs.get(name)
+
+    def _build(self, name: str) -> Optional[LineChannel]:
+        with self._lock:
+            build_lock = self._build_locks.setdefault(name, threading.Lock())
+        with build_lock:
+            # A concurrent webhook for the same channel may have built it already.
+            channel, config = self._cached(name)
+            if channel is not None or config is None:
+                return channel
+            with self._lock:
+                stats = self._stats.setdefault(name, ChannelStats())
+            channel = self._factory(config, stats)
+            with self._lock:
+                self._builds += 1
+                if self._configs.get(name) != config:
+                    # The config changed mid-build: serve this request, don't cache.
+                    return channel
+                self._channels[name] = channel
+                while len(self._channels) > self._max_channels:
+                    self._channels.popitem(last=False)
+                    self._evictions += 1
+            return channel
+
+    async def resolve(self, name: str = DEFAULT_CHANNEL) -> Optional[LineChannel]:
+        """Return the channel called ``name``; a first use builds it off the event loop."""
+
+        if name == DEFAULT_CHANNEL:
+            return self._default
+        self._maybe_reload()
+        channel, config = self._cached(name)
+        if channel is not None or config is None:
+            return channel
+        return await asyncio.to_thread(self._build, name)
+
+    def stats(self) -> Dict[str, ChannelStats]:
+        """Counters for every configured channel, cached or not."""
+
+        with self._lock:
+            return dict(self._stats)
+
+    def snapshot(self) -> Dict[str, object]:
+        with self._lock:
+            return {
+                "configured": len(self._configs) + 1,
+                "cached": len(self._channels) + 1,
+                "max_cached": self._max_channels,
+                "builds": self._builds,
+                "evictions": self._evictions,
+            }
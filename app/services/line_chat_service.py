@@ -2,11 +2,17 @@
 from __future__ import annotations
 
 from pathlib import Path
-from typing import Optional
+from typing import Iterable, Optional, Sequence
 
 from app.services.base_chat_service import BaseChatService
+from app.services.chat_router import DEFAULT_ROUTE, ChatRouter
+from app.services.faq_retriever import FaqRetriever, load_retriever
+from app.services.keyword_router import KeywordRouter, KeywordRule
+from app.services.template_responder import ResponseStats, TemplateResponder
 
-LINE_PROMPT_PATH = Path(__file__).resolve().parent.parent.parent / "prompts" / "line_prompt.txt"
+PROMPTS_DIR = Path(__file__).resolve().parent.parent.parent / "prompts"
+LINE_PROMPT_PATH = PROMPTS_DIR / "line_prompt.txt"
+LINE_KEYWORDS_PATH = PROMPTS_DIR / "line_keywords.json"
 
 FALLBACK_PERSONA = """
 You are Cony，身兼LINE官方帳號小編與客服。
@@ -19,12 +25,27 @@ You are Cony，身兼LINE官方帳號小編與客服。
 - 提醒使用者可以輸入 @客戶服務 或 @促銷活動 獲得更多資訊（勿過度重複）。
 """.strip()
 
-KEYWORD_INSTRUCTIONS = {
-    "@客戶服務": "【客服支援】請用貼心、耐心的語氣回答：",
-    "@促銷活動": "【促銷任務】請用熱情語氣介紹最新活動：",
-}
+FAQ_TOP_K = 3
 
-COSPLAY_KEYWORDS = ("上車舞", "跳舞", "甜點")
+FALLBACK_RULES = (
+    KeywordRule(
+        keywords=("@客戶服務",),
+        instruction="【客服支援】請用貼心、耐心的語氣回答：",
+        priority=200,
+        retrieval=True,
+    ),
+    KeywordRule(
+        keywords=("@促銷活動",),
+        instruction="【促銷任務】請用熱情語氣介紹最新活動：",
+        priority=100,
+    ),
+    KeywordRule(
+        keywords=("上車舞", "跳舞", "甜點"),
+        instruction="（記得撒嬌抱怨一下：在上班不能偷練舞或吃甜點，但還是給對方可愛的回答）",
+        handler="append",
+        priority=10,
+    ),
+)
 
 
 class LineChatService(BaseChatService):
@@ -36,32 +57,63 @@ class LineChatService(BaseChatService):
         app_title: Optional[str] = None,
         model: str = "gpt-4o",
         timeout: int = 30,
+        keywords_path: str | Path = LINE_KEYWORDS_PATH,
+        persona_path: str | Path = LINE_PROMPT_PATH,
+        template_intents: Iterable[str] = ("greeting", "promotions"),
+        extra_api_bases: Sequence[str] = (),
+        fast_model: str | None = None,
+        fast_max_chars: int = 20,
+        faq_retriever: FaqRetriever | None = None,
+        router: ChatRouter | None = None,
+        stats: ResponseStats | None = None,
     ) -> None:
         super().__init__(
             api_key=api_key,
             api_base=api_base,
-            persona_path=LINE_PROMPT_PATH,
+            persona_path=persona_path,
             user_id=user_id,
             app_title=app_title,
             model=model,
             timeout=timeout,
             fallback_persona=FALLBACK_PERSONA,
+            templates=TemplateResponder(enabled_intents=template_intents),
+            extra_api_bases=extra_api_bases,
+            fast_model=fast_model,
+            fast_max_chars=fast_max_chars,
+            router=router,
+            stats=stats,
         )
+        self._keyword_router = KeywordRouter(keywords_path, fallback_rules=FALLBACK_RULES)
+        self._faq = faq_retriever if faq_retriever is not None else load_retriever()
 
-    def _prepare_line_message(self, text: str) -> str:
+    @property
+    def faq_retriever(self) -> FaqRetriever | None:
+        return self._faq
+
+    def _faq_context(self, rule: KeywordRule, content: str) -> str:
+        query = rule.strip_keywords(content)
+        if self._faq is None or not query:
+            return ""
+        hits = self._faq.search(query, k=FAQ_TOP_K)
+        if not hits:
+            return ""
+        passages = "\n".join(f"- Q：{hit.question}\n  A：{hit.answer}" for hit in hits)
+        return f"\n\n（以下是相關的 FAQ，請優先依據內容回答，不相關就忽略）\n{passages}"
+
+    def _prepare_line_message(self, text: str) -> tuple[str, KeywordRule | None]:
         content = text.strip()
-        for keyword, instruction in KEYWORD_INSTRUCTIONS.items():
-            if keyword in content:
-                content = content.replace(keyword, "").strip()
-                if not content:
-                    content = "請主動詢問客戶需求並提供協助。"
-                return f"{instruction}{content}"
-        if any(key in content for key in COSPLAY_KEYWORDS):
-            return (
-                f"{content}\n（記得撒嬌抱怨一下：在上班不能偷練舞或吃甜點，但還是給對方可愛的回答）"
-            )
-        return content or "幫我先跟客戶打招呼並詢問今天的服務需求。"
+        rule = self._keyword_router.match(content)
+        if rule is not None:
+            prepared = rule.apply(content)
+            if rule.retrieval:
+                prepared += self._faq_context(rule, content)
+            return prepared, rule
+        return content or "幫我先跟客戶打招呼並詢問今天的服務需求。", None
 
-    async def generate_reply(self, user_text: str) -> str:
-        prepared = self._prepare_line_message(user_text or "")
-        return await super().generate_reply(prepared)
+    async def generate_reply(self, user_text: str, route: str | None = None) -> str:
+        prepared, rule = self._prepare_line_message(user_text or "")
+        # Keyword intents (客服/促銷) always use the full model; only casual
+        # chatter is eligible for the fast route.
+        if rule is not None and route is None:
+            route = DEFAULT_ROUTE
+        return await super().generate_reply(prepared, route)
@@ -0,0 +1,127 @@
+"""Deliver LINE replies without losing them to slow LLM calls."""
+from __future__ import annotations
+
+import asyncio
+import logging
+import threading
+import time
+from collections import Counter
+from typing import Dict, Optional
+
+import requests
+from linebot.exceptions import LineBotApiError
+from requests import RequestException
+
+logger = logging.getLogger(__name__)
+
+LOADING_ENDPOINT = "https://api.line.me/v2/bot/chat/loading/start"
+MAX_LOADING_SECONDS = 60
+
+
+class DeliveryStats:
+    """Thread-safe delivery counters; may outlive the LineDelivery using them."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._counts: Counter = Counter()
+
+    def count(self, key: str) -> None:
+        with self._lock:
+            self._counts[key] += 1
+
+    def snapshot(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._counts)
+
+
+class LineDelivery:
+    """Shows the loading animation and picks reply vs. push per event.
+
+    Reply tokens expire shortly after the webhook event. If the answer is
+    ready after ``reply_deadline`` seconds (measured from the event
+    timestamp), or the reply is rejected, it is pushed to the chat instead.
+    """
+
+    def __init__(
+        self,
+        line_bot_api,
+        access_token: str,
+        reply_deadline: float = 50.0,
+        loading_seconds: int = 20,
+        timeout: float = 10.0,
+        loading_endpoint: str = LOADING_ENDPOINT,
+        stats: Optional[DeliveryStats] = None,
+    ) -> None:
+        self._line_bot_api = line_bot_api
+        self._access_token = access_token
+        self._reply_deadline = reply_deadline
+        # LINE accepts 5-60 seconds in steps of 5.
+        self._loading_seconds = max(5, min(MAX_LOADING_SECONDS, loading_seconds // 5 * 5))
+        self._timeout = timeout
+        self._loading_endpoint = loading_endpoint
+        self.counters = stats or DeliveryStats()
+
+    def _count(self, key: str) -> None:
+        self.counters.count(key)
+
+    def stats(self) -> Dict[str, int]:
+        return self.counters.snapshot()
+
+    async def start_loading(self, event) -> None:
+        """Start the chat loading animation (one-on-one chats only)."""
+
+        source = event.source
+        if getattr(source, "type", None) != "user":
+            return
+
+        def _call() -> None:
+            response = requests.post(
+                self._loading_endpoint,
+                headers={"Authorization": f"Bearer {self._access_token}"},
+                json={"chatId": source.user_id, "loadingSeconds": self._loading_seconds},
+                timeout=self._timeout,
+            )
+            response.raise_for_status()
+
+        try:
+            await asyncio.to_thread(_call)
+            self._count("loading_started")
+        except RequestException as exc:
+            # Cosmetic only; never block the reply on it.
+            logger.warning("LINE loading animation failed: %s", exc)
+            self._count("loading_failed")
+
+    def reply_token_age(self, event, now: Optional[float] = None) -> float:
+        """Seconds since LINE emitted ``event``."""
+
+        now = time.time() if now is None else now
+        return max(0.0, now - event.timestamp / 1000)
+
+    async def deliver(self, event, message) -> str:
+        """Send ``message`` for ``event``; returns ``"reply"`` or ``"push"``."""
+
+        age = self.reply_token_age(event)
+        if age < self._reply_deadline:
+            try:
+                await asyncio.to_thread(self._line_bot_api.reply_message, event.reply_token, message)
+                self._count("reply")
+                return "reply"
+            except LineBotApiError as exc:
+                if exc.status_code != 400:
+                    raise
+                logger.warning("LINE reply rejected after %.1fs, pushing instead: %s", age, exc)
+                self._count("reply_rejected")
+        else:
+            self._count("reply_expired")
+        await asyncio.to_thread(self._line_bot_api.push_message, _chat_id(event.source), message)
+        self._count("push")
+        return "push"
+
+
+def _chat_id(source) -> str:
+    source_type = getattr(source, "type", None)
+    if source_type == "group":
+        return source.group_id
+    if source_type == "room":
+        return source.room_id
+    return source.user_id
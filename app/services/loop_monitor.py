@@ -0,0 +1,163 @@
+"""Event-loop stall detection for blocking calls inside ``async def`` routes."""
+from __future__ import annotations
+
+import asyncio
+import logging
+import sys
+import threading
+import time
+import traceback
+import weakref
+from collections import deque
+from contextvars import ContextVar
+from typing import Deque, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# Set per request by LoopMonitorMiddleware; child tasks (asyncio.gather etc.)
+# inherit it, so stalls inside them are attributed to the request's route.
+current_route: ContextVar[Optional[str]] = ContextVar("loop_monitor_route", default=None)
+
+
+class LoopMonitor:
+    """Detects when the event loop stops running for longer than a threshold.
+
+    A heartbeat task stamps the time every ``interval`` seconds; a watchdog
+    thread notices when the stamp goes stale, grabs the loop thread's stack and
+    the route of the task that is currently running, and logs it right away
+    (a loop that never recovers still gets reported). The total duration is
+    logged again once the loop is back.
+    """
+
+    def __init__(self, threshold: float = 0.2, interval: float = 0.05, history: int = 50) -> None:
+        self._threshold = threshold
+        self._interval = interval
+        self._recent: Deque[Dict[str, object]] = deque(maxlen=history)
+        self._routes: "weakref.WeakKeyDictionary[asyncio.Task, str]" = weakref.WeakKeyDictionary()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread_id: Optional[int] = None
+        self._last_beat = time.monotonic()
+        self._stop = threading.Event()
+        self._heartbeat_task: Optional[asyncio.Task] = None
+        self._stalls_total = 0
+        self._max_lag = 0.0
+
+    def start(self) -> None:
+        """Start monitoring the running loop; call from inside that loop."""
+
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread_id = threading.get_ident()
+        self._last_beat = time.monotonic()
+        self._stop.clear()
+        self._install_task_factory()
+        self._heartbeat_task = self._loop.create_task(self._heartbeat())
+        threading.Thread(target=self._watch, name="loop-monitor", daemon=True).start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._heartbeat_task is not None:
+            self._heartbeat_task.cancel()
+
+    def track(self, task: asyncio.Task, route: str) -> None:
+        self._routes[task] = route
+
+    def _install_task_factory(self) -> None:
+        # Task.get_context() only exists on 3.12+, and the watchdog thread
+        # cannot read another task's context otherwise. Record the route each
+        # task inherits when it is created (in its parent's context).
+        previous = self._loop.get_task_factory()
+
+        def _factory(loop, coro, **kwargs):
+            if previous is not None:
+                task = previous(loop, coro, **kwargs)
+            else:
+                task = asyncio.Task(coro, loop=loop, **kwargs)
+            route = current_route.get()
+            if route is not None:
+                self._routes[task] = route
+            return task
+
+        self._loop.set_task_factory(_factory)
+
+    def _task_route(self, task: asyncio.Task) -> Optional[str]:
+        get_context = getattr(task, "get_context", None)
+        if get_context is not None:
+            route = get_context().get(current_route)
+            if route is not None:
+                return route
+        return self._routes.get(task)
+
+    async def _heartbeat(self) -> None:
+        while True:
+            self._last_beat = time.monotonic()
+            await asyncio.sleep(self._interval)
+
+    def _watch(self) -> None:
+        stall: Optional[Dict[str, object]] = None
+        while not self._stop.wait(self._interval):
+            lag = time.monotonic() - self._last_beat - self._interval
+            if lag > self._threshold:
+                if stall is None:
+                    stall = self._capture(lag)
+                stall["duration_ms"] = round(lag * 1000, 1)
+            elif stall is not None:
+                self._max_lag = max(self._max_lag, stall["duration_ms"] / 1000)
+                logger.warning(
+                    "Event loop unblocked after %.0f ms (route: %s)",
+                    stall["duration_ms"],
+                    stall["route"],
+                )
+                stall = None
+
+    def _capture(self, lag: float) -> Dict[str, object]:
+        frame = sys._current_frames().get(self._loop_thread_id)
+        stack = "".join(traceback.format_stack(frame)) if frame is not None else ""
+        route = None
+        if self._loop is not None:
+            task = asyncio.current_task(self._loop)
+            route = self._task_route(task) if task is not None else None
+        stall = {
+            "detected_at": time.time(),
+            "duration_ms": round(lag * 1000, 1),
+            "route": route,
+            "stack": stack,
+        }
+        self._stalls_total += 1
+        self._recent.append(stall)
+        logger.warning(
+            "Event loop blocked for over %.0f ms (route: %s)\n%s",
+            stall["duration_ms"],
+            route,
+            stack,
+        )
+        return stall
+
+    def snapshot(self) -> Dict[str, object]:
+        return {
+            "threshold_ms": self._threshold * 1000,
+            "stalls_total": self._stalls_total,
+            "max_lag_ms": round(self._max_lag * 1000, 1),
+            "recent": list(self._recent),
+        }
+
+
+class LoopMonitorMiddleware:
+    """ASGI middleware tagging each request's task with its route for LoopMonitor."""
+
+    def __init__(self, app, monitor: LoopMonitor) -> None:
+        self.app = app
+        self.monitor = monitor
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        route = f"{scope['method']} {scope['path']}"
+        task = asyncio.current_task()
+        if task is not None:
+            self.monitor.track(task, route)
+        token = current_route.set(route)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            current_route.reset(token)
@@ -0,0 +1,51 @@
+"""Time-boxed sampling profiler for a running worker."""
+from __future__ import annotations
+
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Dict
+
+
+class ProfilerBusyError(RuntimeError):
+    """Raised when a profile is already running in this worker."""
+
+
+_running = threading.Lock()
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({code.co_filename}:{frame.f_lineno})"
+
+
+def sample_stacks(duration: float, interval: float = 0.01) -> str:
+    """Sample every thread's stack for ``duration`` seconds.
+
+    Returns collapsed stacks (``thread;outer;...;inner count`` per line), the
+    input format of flamegraph.pl and speedscope. Blocks the calling thread, so
+    run it via ``asyncio.to_thread``.
+    """
+
+    if not _running.acquire(blocking=False):
+        raise ProfilerBusyError("A profile is already running in this worker")
+    try:
+        own_id = threading.get_ident()
+        counts: Counter = Counter()
+        deadline = time.monotonic() + duration
+        while time.monotonic() < deadline:
+            names: Dict[int, str] = {thread.ident: thread.name for thread in threading.enumerate()}
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                stack = []
+                while frame is not None:
+                    stack.append(_frame_label(frame))
+                    frame = frame.f_back
+                stack.append(names.get(thread_id, str(thread_id)))
+                counts[";".join(reversed(stack))] += 1
+            time.sleep(interval)
+        return "".join(f"{stack} {count}\n" for stack, count in counts.most_common())
+    finally:
+        _running.release()
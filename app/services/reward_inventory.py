@@ -0,0 +1,199 @@
+"""Capped daily reward inventory that keeps game wins off hot rows."""
+from __future__ import annotations
+
+import random
+import threading
+from datetime import date, datetime
+from typing import Dict, Optional, Tuple
+from zoneinfo import ZoneInfo
+
+from sqlalchemy import select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from database.models import RewardInventoryShard, RewardUserDaily
+
+GRANTED = "granted"
+SOLD_OUT = "sold_out"
+USER_CAP = "user_cap"
+
+
+class RewardInventory:
+    """Process-wide reward budget shared by all requests of one worker.
+
+    The daily budget is split across ``shards`` counter rows. A worker takes
+    ``batch_size`` rewards at a time from a random shard with a single
+    conditional ``UPDATE`` and hands them out from memory, so most wins never
+    touch the database counters. Rows can only go down to zero, so workers
+    together never issue more than the budget; rewards still held by a worker
+    when it stops or the day rolls over are simply not issued.
+    """
+
+    def __init__(
+        self,
+        campaign: str = "game",
+        daily_budget: Optional[int] = 1000,
+        user_daily_cap: Optional[int] = 3,
+        shards: int = 8,
+        batch_size: int = 10,
+        timezone: str = "Asia/Taipei",
+    ) -> None:
+        self._campaign = campaign
+        self._daily_budget = daily_budget
+        self._user_daily_cap = user_daily_cap
+        self._shards = max(1, shards)
+        self._batch_size = max(1, batch_size)
+        self._timezone = ZoneInfo(timezone)
+        self._lock = threading.Lock()
+        self._local: Dict[date, int] = {}
+        self._seeded: set[date] = set()
+
+    def today(self) -> date:
+        return datetime.now(self._timezone).date()
+
+    def bind(self, session: Session, user_id: str) -> "RewardGate":
+        return RewardGate(self, session, user_id)
+
+    def claim(self, session: Session, user_id: str) -> str:
+        """Reserve one reward for ``user_id``.
+
+        Returns ``GRANTED``, ``SOLD_OUT`` or ``USER_CAP``. The user's win count
+        is left pending in ``session`` and persists with the caller's commit.
+        """
+
+        day = self.today()
+        if not self._take(session, day):
+            return SOLD_OUT
+        if not self._count_win(session, day, user_id):
+            self._give_back(day)
+            return USER_CAP
+        return GRANTED
+
+    def _take(self, session: Session, day: date) -> bool:
+        if self._daily_budget is None:
+            return True
+        with self._lock:
+            # Drop leftovers from previous days; they belong to a closed budget.
+            for stale_day in [d for d in self._local if d != day]:
+                del self._local[stale_day]
+            if self._local.get(day, 0) > 0:
+                self._local[day] -= 1
+                return True
+        taken = self._refill(session, day)
+        if not taken:
+            return False
+        with self._lock:
+            self._local[day] = self._local.get(day, 0) + taken - 1
+        return True
+
+    def _give_back(self, day: date) -> None:
+        if self._daily_budget is None:
+            return
+        with self._lock:
+            if day in self._local:
+                self._local[day] += 1
+
+    def _seed(self, session: Session, day: date) -> None:
+        if day in self._seeded:
+            return
+        base, extra = divmod(self._daily_budget, self._shards)
+        try:
+            session.add_all(
+                RewardInventoryShard(
+                    campaign=self._campaign,
+                    day=day,
+                    shard=shard,
+                    remaining=base + (1 if shard < extra else 0),
+                )
+                for shard in range(self._shards)
+            )
+            session.commit()
+        except IntegrityError:
+            # Another worker seeded today's shards first.
+            session.rollback()
+        self._seeded.add(day)
+
+    def _refill(self, session: Session, day: date) -> int:
+        self._seed(session, day)
+        shard_order = list(range(self._shards))
+        random.shuffle(shard_order)
+        for shard in shard_order:
+            taken = self._decrement(session, day, shard)
+            if taken:
+                return taken
+        return 0
+
+    def _decrement(self, session: Session, day: date, shard: int) -> int:
+        key = (
+            RewardInventoryShard.campaign == self._campaign,
+            RewardInventoryShard.day == day,
+            RewardInventoryShard.shard == shard,
+        )
+        result = session.execute(
+            update(RewardInventoryShard)
+            .where(*key, RewardInventoryShard.remaining >= self._batch_size)
+            .values(remaining=RewardInventoryShard.remaining - self._batch_size)
+        )
+        session.commit()
+        if result.rowcount:
+            return self._batch_size
+        # Shard is nearly drained: take whatever is left (compare-and-set).
+        for _ in range(3):
+            remaining = session.scalar(select(RewardInventoryShard.remaining).where(*key))
+            if not remaining:
+                return 0
+            result = session.execute(
+                update(RewardInventoryShard)
+                .where(*key, RewardInventoryShard.remaining == remaining)
+                .values(remaining=0)
+            )
+            session.commit()
+            if result.rowcount:
+                return remaining
+        return 0
+
+    def _count_win(self, session: Session, day: date, user_id: str) -> bool:
+        """Increment the user's win counter unless the daily cap is reached.
+
+        Runs inside the caller's transaction so it commits with the coupon.
+        """
+
+        if self._user_daily_cap is None:
+            return True
+        key: Tuple = (
+            RewardUserDaily.campaign == self._campaign,
+            RewardUserDaily.day == day,
+            RewardUserDaily.user_id == user_id,
+        )
+        for _ in range(2):
+            result = session.execute(
+                update(RewardUserDaily)
+                .where(*key, RewardUserDaily.wins < self._user_daily_cap)
+                .values(wins=RewardUserDaily.wins + 1)
+            )
+            if result.rowcount:
+                return True
+            if session.scalar(select(RewardUserDaily.wins).where(*key)) is not None:
+                return False
+            try:
+                with session.begin_nested():
+                    session.add(
+                        RewardUserDaily(campaign=self._campaign, day=day, user_id=user_id, wins=1)
+                    )
+                return True
+            except IntegrityError:
+                # Concurrent first win for this user; retry the conditional update.
+                continue
+        return False
+
+
+class RewardGate:
+    """Per-request view of a RewardInventory for one user and session."""
+
+    def __init__(self, inventory: RewardInventory, session: Session, user_id: str) -> None:
+        self._inventory = inventory
+        self._session = session
+        self._user_id = user_id
+
+    def claim(self) -> str:
+        return self._inventory.claim(self._session, self._user_id)
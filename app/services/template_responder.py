@@ -0,0 +1,147 @@
+"""Local template replies for deterministic intents (no LLM call)."""
+from __future__ import annotations
+
+import json
+import re
+import threading
+from collections import Counter
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional
+
+DEFAULT_COUPONS_PATH = (
+    Path(__file__).resolve().parent.parent.parent / "data" / "default-coupons.json"
+)
+PROMOTION_KEYWORD = "@促銷活動"
+GREETINGS = frozenset(
+    {"hi", "hello", "hey", "嗨", "哈囉", "你好", "您好", "安安", "早安", "午安", "晚安", "cony"}
+)
+MAX_CAROUSEL_BUBBLES = 12
+_PUNCTUATION = re.compile(r"[\s!！?？~～.,。，、❤♥️]+")
+
+GREETING_TEXT = (
+    "嗨嗨～我是 Cony 🐰💕 今天想找我聊什麼呢？\n"
+    "輸入「@促銷活動」看最新優惠，或輸入「@客戶服務」讓我幫你解決問題喔！"
+)
+
+
+@dataclass
+class TemplateReply:
+    intent: str
+    text: str
+    flex: Optional[dict] = None
+
+
+class ResponseStats:
+    """Thread-safe counters of replies served locally vs. by the LLM."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._sources: Counter = Counter()
+        self._intents: Counter = Counter()
+
+    def record(self, source: str, intent: Optional[str] = None) -> None:
+        with self._lock:
+            self._sources[source] += 1
+            if intent:
+                self._intents[intent] += 1
+
+    def snapshot(self) -> Dict[str, object]:
+        with self._lock:
+            template = self._sources["template"]
+            llm = self._sources["llm"]
+            intents = dict(self._intents)
+        total = template + llm
+        return {
+            "total": total,
+            "template": template,
+            "llm": llm,
+            "template_share": round(template / total, 4) if total else 0.0,
+            "intents": intents,
+        }
+
+
+def _normalize(text: str) -> str:
+    return _PUNCTUATION.sub("", text).lower()
+
+
+def _load_campaigns(path: Path) -> List[dict]:
+    if not path.exists():
+        return []
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+def _campaign_bubble(campaign: dict) -> dict:
+    return {
+        "type": "bubble",
+        "size": "kilo",
+        "body": {
+            "type": "box",
+            "layout": "vertical",
+            "spacing": "sm",
+            "contents": [
+                {
+                    "type": "text",
+                    "text": campaign.get("title", ""),
+                    "weight": "bold",
+                    "color": "#ff5fa2",
+                    "wrap": True,
+                },
+                {
+                    "type": "text",
+                    "text": campaign.get("description", "") or " ",
+                    "size": "sm",
+                    "wrap": True,
+                },
+            ],
+        },
+    }
+
+
+class TemplateResponder:
+    """Matches deterministic intents and renders their replies locally."""
+
+    def __init__(
+        self,
+        enabled_intents: Iterable[str] = ("greeting", "promotions"),
+        coupons_path: str | Path = DEFAULT_COUPONS_PATH,
+    ) -> None:
+        self._enabled = frozenset(enabled_intents)
+        self._campaigns = _load_campaigns(Path(coupons_path))
+        self._handlers: Dict[str, Callable[[str], Optional[TemplateReply]]] = {
+            "promotions": self._promotions,
+            "greeting": self._greeting,
+        }
+
+    def render(self, user_text: str) -> Optional[TemplateReply]:
+        """Return a local reply, or ``None`` when the LLM should answer."""
+
+        content = (user_text or "").strip()
+        for intent, handler in self._handlers.items():
+            if intent in self._enabled:
+                reply = handler(content)
+                if reply is not None:
+                    return reply
+        return None
+
+    def _promotions(self, content: str) -> Optional[TemplateReply]:
+        # Only a bare "@促銷活動" is deterministic; follow-up questions go to the LLM.
+        if PROMOTION_KEYWORD not in content or content.replace(PROMOTION_KEYWORD, "").strip():
+            return None
+        if not self._campaigns:
+            return None
+        lines = [
+            f"・{campaign.get('title', '')}：{campaign.get('description', '')}"
+            for campaign in self._campaigns
+        ]
+        text = "Cony 幫你整理了最新優惠 🎀\n" + "\n".join(lines)
+        flex = {
+            "type": "carousel",
+            "contents": [_campaign_bubble(c) for c in self._campaigns[:MAX_CAROUSEL_BUBBLES]],
+        }
+        return TemplateReply(intent="promotions", text=text, flex=flex)
+
+    def _greeting(self, content: str) -> Optional[TemplateReply]:
+        if not content or _normalize(content) in GREETINGS:
+            return TemplateReply(intent="greeting", text=GREETING_TEXT)
+        return None
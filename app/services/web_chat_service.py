@@ -2,7 +2,7 @@
 from __future__ import annotations
 
 from pathlib import Path
-from typing import Optional
+from typing import Optional, Sequence
 
 from app.services.base_chat_service import BaseChatService
 
@@ -29,6 +29,9 @@ class WebChatService(BaseChatService):
         app_title: Optional[str] = None,
         model: str = "gpt-4o",
         timeout: int = 30,
+        extra_api_bases: Sequence[str] = (),
+        fast_model: str | None = None,
+        fast_max_chars: int = 20,
     ) -> None:
         super().__init__(
             api_key=api_key,
@@ -39,4 +42,7 @@ class WebChatService(BaseChatService):
             model=model,
             timeout=timeout,
             fallback_persona=FALLBACK_PERSONA,
+            extra_api_bases=extra_api_bases,
+            fast_model=fast_model,
+            fast_max_chars=fast_max_chars,
         )
@@ -1,4 +1,14 @@
 """Database helpers package."""
 
-from .models import AppUser, Coupon, CouponType, Base  # noqa: F401
-from .session import create_session_factory  # noqa: F401
+from .models import (  # noqa: F401
+    AppUser,
+    Base,
+    Coupon,
+    CouponArchive,
+    CouponRedemption,
+    CouponStatus,
+    CouponType,
+    RewardInventoryShard,
+    RewardUserDaily,
+)
+from .session import READ_REPLICA_OPTION, create_session_factory, pool_stats  # noqa: F401
@@ -6,9 +6,11 @@ from datetime import datetime
 
 from sqlalchemy import (
     Column,
+    Date,
     DateTime,
     Enum,
     ForeignKey,
+    Index,
     Integer,
     String,
     Text,
@@ -24,6 +26,11 @@ class CouponType(enum.Enum):
     game = "game"
 
 
+class CouponStatus(enum.Enum):
+    active = "active"
+    redeemed = "redeemed"
+
+
 class AppUser(Base):
     __tablename__ = "app_user"
 
@@ -36,7 +43,6 @@ class AppUser(Base):
 
 class Coupon(Base):
     __tablename__ = "coupon"
-    __table_args__ = (UniqueConstraint("code", name="uq_coupon_code"),)
 
     id = Column(Integer, primary_key=True)
     user_id = Column(String(128), ForeignKey("app_user.user_id", ondelete="CASCADE"), nullable=False)
@@ -44,6 +50,75 @@ class Coupon(Base):
     code = Column(String(64), nullable=False)
     title = Column(String(200), nullable=False)
     description = Column(Text, nullable=True)
+    status = Column(Enum(CouponStatus), nullable=False, default=CouponStatus.active)
+    expires_at = Column(DateTime(timezone=True), nullable=True)
+    redeemed_at = Column(DateTime(timezone=True), nullable=True)
     created_at = Column(DateTime(timezone=True), default=datetime.utcnow)
 
     user = relationship("AppUser", back_populates="coupons")
+
+    __table_args__ = (
+        UniqueConstraint("code", name="uq_coupon_code"),
+        # list_coupons: a user's active coupons, newest first.
+        Index(
+            "ix_coupon_user_active",
+            "user_id",
+            created_at.desc(),
+            postgresql_where=status == CouponStatus.active,
+            sqlite_where=status == CouponStatus.active,
+        ),
+        # Archival scans for expired / long-redeemed rows.
+        Index("ix_coupon_expires_at", "expires_at"),
+        Index("ix_coupon_redeemed_at", "redeemed_at"),
+    )
+
+
+class CouponArchive(Base):
+    """Cold copy of expired or redeemed coupons kept for analytics."""
+
+    __tablename__ = "coupon_archive"
+
+    id = Column(Integer, primary_key=True)
+    user_id = Column(String(128), nullable=False, index=True)
+    type = Column(Enum(CouponType), nullable=False)
+    code = Column(String(64), nullable=False)
+    title = Column(String(200), nullable=False)
+    description = Column(Text, nullable=True)
+    status = Column(Enum(CouponStatus), nullable=False)
+    expires_at = Column(DateTime(timezone=True), nullable=True)
+    redeemed_at = Column(DateTime(timezone=True), nullable=True)
+    created_at = Column(DateTime(timezone=True))
+    archived_at = Column(DateTime(timezone=True), default=datetime.utcnow)
+
+
+class CouponRedemption(Base):
+    """Idempotency record for a redeemed coupon, keyed by the client's key."""
+
+    __tablename__ = "coupon_redemption"
+
+    user_id = Column(String(128), primary_key=True)
+    idempotency_key = Column(String(128), primary_key=True)
+    code = Column(String(64), nullable=False)
+    redeemed_at = Column(DateTime(timezone=True), default=datetime.utcnow)
+
+
+class RewardInventoryShard(Base):
+    """One slice of a campaign's daily reward budget (see RewardInventory)."""
+
+    __tablename__ = "reward_inventory_shard"
+
+    campaign = Column(String(64), primary_key=True)
+    day = Column(Date, primary_key=True)
+    shard = Column(Integer, primary_key=True)
+    remaining = Column(Integer, nullable=False)
+
+
+class RewardUserDaily(Base):
+    """Per-user win counter used for daily caps."""
+
+    __tablename__ = "reward_user_daily"
+
+    campaign = Column(String(64), primary_key=True)
+    day = Column(Date, primary_key=True)
+    user_id = Column(String(128), primary_key=True)
+    wins = Column(Integer, nullable=False, default=0)
@@ -0,0 +1,77 @@
+"""Helpers for the optional monthly partitioning of the coupon table."""
+from __future__ import annotations
+
+import asyncio
+import logging
+from datetime import date
+
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+PARTITIONED_QUERY = text(
+    "SELECT 1 FROM pg_partitioned_table p JOIN pg_class c ON c.oid = p.partrelid "
+    "WHERE c.relname = :table"
+)
+
+
+def _month_start(day: date, offset: int) -> date:
+    month_index = day.year * 12 + day.month - 1 + offset
+    return date(month_index // 12, month_index % 12 + 1, 1)
+
+
+def is_partitioned(engine: Engine, table: str = "coupon") -> bool:
+    if engine.dialect.name != "postgresql":
+        return False
+    with engine.connect() as conn:
+        return conn.scalar(PARTITIONED_QUERY, {"table": table}) is not None
+
+
+def ensure_monthly_partitions(
+    engine: Engine,
+    table: str = "coupon",
+    months_ahead: int = 2,
+    today: date | None = None,
+) -> list[str]:
+    """Create ``<table>_YYYYMM`` partitions up to ``months_ahead`` months out.
+
+    No-op unless ``table`` was converted with
+    ``database/sql/partition_coupon_by_month.sql``.
+    """
+
+    if not is_partitioned(engine, table):
+        return []
+    today = today or date.today()
+    created: list[str] = []
+    with engine.begin() as conn:
+        # Every worker runs this at startup; serialize them instead of racing
+        # on CREATE TABLE IF NOT EXISTS.
+        conn.execute(text("SELECT pg_advisory_xact_lock(hashtext(:name))"), {"name": table})
+        for offset in range(months_ahead + 1):
+            start = _month_start(today, offset)
+            end = _month_start(today, offset + 1)
+            name = f"{table}_{start:%Y%m}"
+            conn.execute(
+                text(
+                    f'CREATE TABLE IF NOT EXISTS "{name}" PARTITION OF "{table}" '
+                    f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+                )
+            )
+            created.append(name)
+    return created
+
+
+async def maintain_monthly_partitions(engine: Engine, interval: float = 6 * 3600) -> None:
+    """Run ``ensure_monthly_partitions`` now and then every ``interval`` seconds.
+
+    Independent of coupon archival, so inserts never outrun the partitions even
+    when archival is disabled.
+    """
+
+    while True:
+        try:
+            await asyncio.to_thread(ensure_monthly_partitions, engine)
+        except Exception:  # keep the loop alive; next run retries
+            logger.exception("Creating coupon partitions failed")
+        await asyncio.sleep(interval)
@@ -1,10 +1,183 @@
 """Database session helpers."""
 from __future__ import annotations
 
+import math
+import threading
+import time
+from typing import Dict, Optional
+
 from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import QueuePool
+
+READ_REPLICA_OPTION = "read_replica"
+# Set on clients that wrote recently; see ReadYourWritesMiddleware.
+READ_YOUR_WRITES_COOKIE = "cony_recent_write"
+
+
+class TimedQueuePool(QueuePool):
+    """QueuePool that records how long checkouts wait for a connection."""
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self._stats_lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            with self._stats_lock:
+                self.timeouts += 1
+            raise
+        finally:
+            waited = time.perf_counter() - started
+            with self._stats_lock:
+                self.checkouts += 1
+                self.wait_total += waited
+                self.wait_max = max(self.wait_max, waited)
+
+    def recreate(self):
+        # Keep the subclass (and its counters) across engine.dispose().
+        pool = super().recreate()
+        pool.checkouts, pool.timeouts = self.checkouts, self.timeouts
+        pool.wait_total, pool.wait_max = self.wait_total, self.wait_max
+        return pool
+
+    def stats(self) -> Dict[str, object]:
+        with self._stats_lock:
+            checkouts = self.checkouts
+            return {
+                "size": self.size(),
+                "checked_out": self.checkedout(),
+                "overflow": self.overflow(),
+                "checkouts": checkouts,
+                "timeouts": self.timeouts,
+                "wait_avg_ms": round(self.wait_total / checkouts * 1000, 3) if checkouts else 0.0,
+                "wait_max_ms": round(self.wait_max * 1000, 3),
+            }
+
+
+class RoutingSession(Session):
+    """Session that sends opted-in reads to a replica engine.
+
+    Only statements carrying ``execution_options(read_replica=True)`` may go
+    to the replica, and only if this session has not written yet and
+    ``info["recent_write"]`` is not set (the client wrote within the
+    read-your-writes window). Everything else uses the primary.
+    """
+
+    def __init__(self, *args, replica_bind: Optional[Engine] = None, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self._replica_bind = replica_bind
+
+    def get_bind(self, mapper=None, clause=None, **kwargs):
+        primary = super().get_bind(mapper, clause=clause, **kwargs)
+        if self._flushing or (clause is not None and getattr(clause, "is_dml", False)):
+            self.info["wrote"] = True
+            return primary
+        if (
+            self._replica_bind is None
+            or not hasattr(clause, "get_execution_options")
+            or not clause.get_execution_options().get(READ_REPLICA_OPTION)
+            or self.info.get("wrote")
+            or self.info.get("recent_write")
+        ):
+            return primary
+        return self._replica_bind
+
+
+class ReadYourWritesMiddleware:
+    """ASGI middleware that remembers a client's writes across workers.
+
+    When the request's session (``request.state.db_session_info``, set by
+    ``get_db``) wrote, the response sets a short-lived cookie. Its presence on
+    later requests sends opted-in replica reads to the primary, whichever
+    worker serves them.
+    """
+
+    def __init__(self, app, window: float = 5.0) -> None:
+        self.app = app
+        self.cookie = (
+            f"{READ_YOUR_WRITES_COOKIE}=1; Max-Age={max(1, math.ceil(window))}; "
+            "Path=/; HttpOnly; SameSite=Lax"
+        ).encode("latin-1")
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        state = scope.setdefault("state", {})
+
+        async def _send(message) -> None:
+            if message["type"] == "http.response.start":
+                info = state.get("db_session_info")
+                if info is not None and info.get("wrote"):
+                    headers = [*message.get("headers", []), (b"set-cookie", self.cookie)]
+                    message = {**message, "headers": headers}
+            await send(message)
+
+        await self.app(scope, receive, _send)
+
+
+def _create_engine(
+    url: str,
+    pool_size: int,
+    max_overflow: int,
+    pool_recycle: int,
+    pool_timeout: float,
+) -> Engine:
+    return create_engine(
+        url,
+        poolclass=TimedQueuePool,
+        pool_pre_ping=True,
+        pool_size=pool_size,
+        max_overflow=max_overflow,
+        pool_recycle=pool_recycle,
+        pool_timeout=pool_timeout,
+    )
+
+
+def create_session_factory(
+    database_url: str,
+    replica_url: Optional[str] = None,
+    pool_size: int = 5,
+    max_overflow: int = 10,
+    pool_recycle: int = 1800,
+    pool_timeout: float = 30.0,
+):
+    pool_options = dict(
+        pool_size=pool_size,
+        max_overflow=max_overflow,
+        pool_recycle=pool_recycle,
+        pool_timeout=pool_timeout,
+    )
+    engine = _create_engine(database_url, **pool_options)
+    replica = _create_engine(replica_url, **pool_options) if replica_url else None
+    return sessionmaker(
+        bind=engine,
+        class_=RoutingSession,
+        autocommit=False,
+        autoflush=False,
+        replica_bind=replica,
+    )
+
 
+def pool_stats(session_factory) -> Dict[str, object]:
+    """Checkout wait times and pool usage for the primary and replica."""
 
-def create_session_factory(database_url: str):
-    engine = create_engine(database_url, pool_pre_ping=True)
-    return sessionmaker(bind=engine, autocommit=False, autoflush=False)
+    engines = {
+        "primary": session_factory.kw["bind"],
+        "replica": session_factory.kw.get("replica_bind"),
+    }
+    return {
+        name: engine.pool.stats()
+        for name, engine in engines.items()
+        if engine is not None and isinstance(engine.pool, TimedQueuePool)
+    }
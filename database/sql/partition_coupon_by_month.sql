@@ -0,0 +1,65 @@
+-- Convert the coupon table into monthly range partitions on created_at.
+--
+-- Postgres requires the partition key in every unique constraint, so the
+-- primary key becomes (id, created_at) and code uniqueness is enforced per
+-- partition (codes are random, collisions across months are not expected).
+-- Run once during a maintenance window; new partitions are created ahead of
+-- time by database.partitioning.ensure_monthly_partitions (run by every worker
+-- at startup and every few hours), and old months can be detached and dropped
+-- cheaply.
+
+BEGIN;
+
+ALTER TABLE coupon RENAME TO coupon_unpartitioned;
+ALTER INDEX IF EXISTS ix_coupon_user_active RENAME TO ix_coupon_unpartitioned_user_active;
+ALTER INDEX IF EXISTS ix_coupon_expires_at RENAME TO ix_coupon_unpartitioned_expires_at;
+ALTER INDEX IF EXISTS ix_coupon_redeemed_at RENAME TO ix_coupon_unpartitioned_redeemed_at;
+
+CREATE TABLE coupon (
+    LIKE coupon_unpartitioned INCLUDING DEFAULTS,
+    PRIMARY KEY (id, created_at),
+    CONSTRAINT uq_coupon_code UNIQUE (code, created_at),
+    FOREIGN KEY (user_id) REFERENCES app_user (user_id) ON DELETE CASCADE
+) PARTITION BY RANGE (created_at);
+
+ALTER TABLE coupon ALTER COLUMN created_at SET NOT NULL;
+ALTER TABLE coupon ALTER COLUMN created_at SET DEFAULT now();
+-- The copied id default still uses coupon_id_seq; move its ownership so that
+-- dropping coupon_unpartitioned later does not take the sequence with it.
+ALTER SEQUENCE coupon_id_seq OWNED BY coupon.id;
+
+CREATE INDEX ix_coupon_user_active ON coupon (user_id, created_at DESC) WHERE status = 'active';
+CREATE INDEX ix_coupon_expires_at ON coupon (expires_at);
+CREATE INDEX ix_coupon_redeemed_at ON coupon (redeemed_at);
+
+-- Catch-all for existing rows; new months get their own partitions.
+CREATE TABLE coupon_legacy PARTITION OF coupon
+    FOR VALUES FROM (MINVALUE) TO (date_trunc('month', now()));
+
+-- Safety net: a row whose month has no partition yet lands here instead of
+-- failing the insert. Keep it empty: creating a month's partition scans it and
+-- fails if it already holds rows for that month (move them out first).
+CREATE TABLE coupon_default PARTITION OF coupon DEFAULT;
+
+DO $$
+DECLARE
+    month_start date;
+BEGIN
+    FOR offset_months IN 0..2 LOOP
+        month_start := (date_trunc('month', now()) + make_interval(months => offset_months))::date;
+        EXECUTE format(
+            'CREATE TABLE IF NOT EXISTS %I PARTITION OF coupon FOR VALUES FROM (%L) TO (%L)',
+            'coupon_' || to_char(month_start, 'YYYYMM'),
+            month_start,
+            (month_start + interval '1 month')::date
+        );
+    END LOOP;
+END $$;
+
+-- created_at is part of the partition key; keep rows that never had one.
+UPDATE coupon_unpartitioned SET created_at = now() WHERE created_at IS NULL;
+INSERT INTO coupon SELECT * FROM coupon_unpartitioned;
+
+COMMIT;
+
+-- After verifying row counts: DROP TABLE coupon_unpartitioned;
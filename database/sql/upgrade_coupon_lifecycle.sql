@@ -0,0 +1,68 @@
+-- Bring a database created before the coupon lifecycle changes up to date.
+--
+-- Adds coupon.status / expires_at / redeemed_at and their indexes, and creates
+-- coupon_archive, coupon_redemption and the reward inventory tables.
+-- Metadata.create_all() only creates missing tables; it never alters the
+-- existing coupon table. Safe to re-run. Run it before deploying: /coupons,
+-- /play-with-cony, /use-coupon and the archival job all need these columns.
+
+BEGIN;
+
+DO $$
+BEGIN
+    CREATE TYPE couponstatus AS ENUM ('active', 'redeemed');
+EXCEPTION
+    WHEN duplicate_object THEN NULL;
+END $$;
+
+-- Existing rows become active.
+ALTER TABLE coupon ADD COLUMN IF NOT EXISTS status couponstatus NOT NULL DEFAULT 'active';
+ALTER TABLE coupon ADD COLUMN IF NOT EXISTS expires_at TIMESTAMP WITH TIME ZONE;
+ALTER TABLE coupon ADD COLUMN IF NOT EXISTS redeemed_at TIMESTAMP WITH TIME ZONE;
+
+CREATE INDEX IF NOT EXISTS ix_coupon_user_active
+    ON coupon (user_id, created_at DESC) WHERE status = 'active';
+CREATE INDEX IF NOT EXISTS ix_coupon_expires_at ON coupon (expires_at);
+CREATE INDEX IF NOT EXISTS ix_coupon_redeemed_at ON coupon (redeemed_at);
+
+CREATE TABLE IF NOT EXISTS coupon_archive (
+    id SERIAL NOT NULL,
+    user_id VARCHAR(128) NOT NULL,
+    type coupontype NOT NULL,
+    code VARCHAR(64) NOT NULL,
+    title VARCHAR(200) NOT NULL,
+    description TEXT,
+    status couponstatus NOT NULL,
+    expires_at TIMESTAMP WITH TIME ZONE,
+    redeemed_at TIMESTAMP WITH TIME ZONE,
+    created_at TIMESTAMP WITH TIME ZONE,
+    archived_at TIMESTAMP WITH TIME ZONE,
+    PRIMARY KEY (id)
+);
+CREATE INDEX IF NOT EXISTS ix_coupon_archive_user_id ON coupon_archive (user_id);
+
+CREATE TABLE IF NOT EXISTS coupon_redemption (
+    user_id VARCHAR(128) NOT NULL,
+    idempotency_key VARCHAR(128) NOT NULL,
+    code VARCHAR(64) NOT NULL,
+    redeemed_at TIMESTAMP WITH TIME ZONE,
+    PRIMARY KEY (user_id, idempotency_key)
+);
+
+CREATE TABLE IF NOT EXISTS reward_inventory_shard (
+    campaign VARCHAR(64) NOT NULL,
+    day DATE NOT NULL,
+    shard INTEGER NOT NULL,
+    remaining INTEGER NOT NULL,
+    PRIMARY KEY (campaign, day, shard)
+);
+
+CREATE TABLE IF NOT EXISTS reward_user_daily (
+    campaign VARCHAR(64) NOT NULL,
+    day DATE NOT NULL,
+    user_id VARCHAR(128) NOT NULL,
+    wins INTEGER NOT NULL,
+    PRIMARY KEY (campaign, day, user_id)
+);
+
+COMMIT;
@@ -181,11 +181,15 @@ const playGame = async (choice, container, resultEl, recentCouponList) => {
         }
         const rewardCoupon = data.reward && data.reward.new_coupon;
         const couponName = rewardCoupon && rewardCoupon.title ? rewardCoupon.title : '粉紅禮物';
-        const message = data.did_win
+        let message = data.did_win
             ? `你選了 ${choice}，Cony 也選了 ${data.cony_choice}！新增優惠券：${couponName}！`
             : `你選了 ${choice}，但Cony今天想要 ${data.cony_choice}，再接再厲！`;
+        if (data.did_win && !rewardCoupon) {
+            // Sold out and per-user cap share this branch; the server says which.
+            message = `你選了 ${choice}，Cony 也選了 ${data.cony_choice}！${data.reward.message}`;
+        }
         resultEl.textContent = message;
-        if (data.did_win) {
+        if (data.did_win && rewardCoupon) {
             if (recentCouponList) {
                 renderRecentCoupon(recentCouponList, rewardCoupon);
             }
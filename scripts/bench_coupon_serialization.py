@@ -0,0 +1,79 @@
+"""Microbenchmark: /coupons response serialization as a user's coupons grow.
+
+Compares the old path (dict per row -> jsonable_encoder -> JSONResponse) with
+the typed one (DTO per row -> model_dump -> ORJSONResponse, as returned by the
+routes), and with letting FastAPI's response_model pass re-validate the DTOs. Rows are
+tuples, like the column select in ``CouponService.list_coupons``.
+
+Run with ``python -m scripts.bench_coupon_serialization``.
+"""
+from __future__ import annotations
+
+import asyncio
+import timeit
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, ORJSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+
+from app.schemas import CouponList
+from app.services.coupon_service import _coupon_out
+from database.models import CouponType
+
+FIELD = create_response_field(name="response", type_=CouponList)
+LOOP = asyncio.new_event_loop()
+
+
+def _rows(count: int):
+    return [
+        (
+            f"CONY-{index:08X}",
+            "Cony粉紅9折券",
+            "贏得遊戲即可享受全品項9折優惠。",
+            CouponType.game if index % 3 else CouponType.permanent,
+        )
+        for index in range(count)
+    ]
+
+
+def _dict_path(rows) -> bytes:
+    coupons = [
+        {
+            "id": code,
+            "title": title,
+            "description": description or "",
+            "source": "game" if type_ == CouponType.game else "catalog",
+        }
+        for code, title, description, type_ in rows
+    ]
+    return JSONResponse(jsonable_encoder({"coupons": coupons})).body
+
+
+def _typed_path(rows) -> bytes:
+    content = CouponList(coupons=[_coupon_out(*row) for row in rows])
+    return ORJSONResponse(content.model_dump()).body
+
+
+def _response_model_path(rows) -> bytes:
+    content = CouponList(coupons=[_coupon_out(*row) for row in rows])
+    payload = LOOP.run_until_complete(serialize_response(field=FIELD, response_content=content))
+    return ORJSONResponse(payload).body
+
+
+def main() -> None:
+    print(
+        f"{'coupons':>8} {'dict + json (ms)':>17} {'dto + orjson (ms)':>18} "
+        f"{'+ response_model (ms)':>21} {'speedup':>8}"
+    )
+    for count in (10, 100, 500, 1_000):
+        rows = _rows(count)
+        loops = 200
+        old = timeit.timeit(lambda: _dict_path(rows), number=loops) / loops * 1e3
+        new = timeit.timeit(lambda: _typed_path(rows), number=loops) / loops * 1e3
+        validated = timeit.timeit(lambda: _response_model_path(rows), number=loops) / loops * 1e3
+        print(f"{count:>8} {old:>17.3f} {new:>18.3f} {validated:>21.3f} {old / new:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
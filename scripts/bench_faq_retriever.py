@@ -0,0 +1,44 @@
+"""Microbenchmark: FAQ retrieval latency as the corpus grows.
+
+Run with ``python -m scripts.bench_faq_retriever``.
+"""
+from __future__ import annotations
+
+import json
+import random
+import tempfile
+import time
+import timeit
+from pathlib import Path
+
+from app.services.faq_retriever import FaqRetriever
+
+QUERY = "遊戲贏了卻沒有拿到優惠券怎麼辦"
+VOCAB = "優惠券遊戲登入過期使用門市點心粉紅兔兔活動帳號兌換折扣咖啡早午餐營業時間退換客服訊息"
+
+
+def _entry(rng: random.Random) -> dict:
+    return {
+        "question": "".join(rng.choices(VOCAB, k=rng.randint(8, 16))) + "？",
+        "answer": "".join(rng.choices(VOCAB, k=rng.randint(30, 80))) + "。",
+    }
+
+
+def main() -> None:
+    rng = random.Random(42)
+    print(f"{'entries':>8} {'build (s)':>10} {'search (ms)':>12} {'batch of 32 (ms)':>17}")
+    for count in (1_000, 10_000, 50_000):
+        with tempfile.TemporaryDirectory() as tmp:
+            corpus = Path(tmp) / "faq.json"
+            corpus.write_text(json.dumps([_entry(rng) for _ in range(count)], ensure_ascii=False))
+            started = time.perf_counter()
+            retriever = FaqRetriever(corpus, Path(tmp) / "index")
+            build = time.perf_counter() - started
+            loops = 200
+            single = timeit.timeit(lambda: retriever.search(QUERY), number=loops) / loops * 1e3
+            batch = timeit.timeit(lambda: retriever.search_batch([QUERY] * 32), number=20) / 20 * 1e3
+            print(f"{count:>8} {build:>10.2f} {single:>12.2f} {batch:>17.2f}")
+
+
+if __name__ == "__main__":
+    main()
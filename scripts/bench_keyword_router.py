@@ -0,0 +1,46 @@
+"""Microbenchmark: keyword matching cost as the rule count grows.
+
+Run with ``python -m scripts.bench_keyword_router``.
+"""
+from __future__ import annotations
+
+import random
+import string
+import timeit
+
+from app.services.keyword_router import KeywordMatcher, KeywordRule
+
+MESSAGE = "Cony 你好～想問一下這週末的 @促銷活動 有什麼甜點優惠嗎？" * 2
+
+
+def _random_keyword(rng: random.Random) -> str:
+    return "@" + "".join(rng.choices(string.ascii_lowercase + "粉紅兔兔活動", k=rng.randint(3, 8)))
+
+
+def _linear_scan(rules, text):
+    best = None
+    for rule in rules:
+        if any(keyword in text for keyword in rule.keywords):
+            if best is None or rule.priority > best.priority:
+                best = rule
+    return best
+
+
+def main() -> None:
+    rng = random.Random(42)
+    print(f"{'rules':>8} {'automaton (us)':>16} {'linear scan (us)':>18}")
+    for count in (10, 100, 1_000, 5_000, 20_000):
+        rules = [
+            KeywordRule(keywords=(_random_keyword(rng),), instruction="", priority=rng.randint(0, 100))
+            for _ in range(count)
+        ]
+        rules.append(KeywordRule(keywords=("@促銷活動",), instruction="", priority=50))
+        matcher = KeywordMatcher(rules)
+        loops = 2_000
+        compiled = timeit.timeit(lambda: matcher.match(MESSAGE), number=loops) / loops * 1e6
+        linear = timeit.timeit(lambda: _linear_scan(rules, MESSAGE), number=200) / 200 * 1e6
+        print(f"{count:>8} {compiled:>16.2f} {linear:>18.2f}")
+
+
+if __name__ == "__main__":
+    main()
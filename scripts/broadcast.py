@@ -0,0 +1,55 @@
+"""Push a personalized campaign message to LINE users.
+
+Examples::
+
+    python -m scripts.broadcast spring-sale \\
+        "用一句話邀請擁有 {coupon_count} 張優惠券的好友來參加春季甜點祭" --dry-run
+    python -m scripts.broadcast spring-sale "..." --user-id U123 --user-id U456
+
+Re-running with the same campaign id resumes from ``data/broadcasts/<id>.jsonl``.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+from dataclasses import asdict
+
+from linebot import LineBotApi
+
+from app.config import get_settings
+from app.dependencies import get_line_chat_service, get_session_factory
+from app.services.broadcast_service import BroadcastService, load_targets
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("campaign_id")
+    parser.add_argument("prompt_template", help="str.format template; fields: user_id, coupon_count")
+    parser.add_argument("--user-id", action="append", dest="user_ids")
+    parser.add_argument("--dry-run", action="store_true", help="send to a stub LINE API")
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--rps", type=float, default=10.0, help="multicast requests per second")
+    args = parser.parse_args()
+
+    settings = get_settings()
+    session = get_session_factory(settings)()
+    try:
+        targets = load_targets(session, args.user_ids, exclude_user_id=settings.default_user_id)
+    finally:
+        session.close()
+
+    service = BroadcastService(
+        chat_service=get_line_chat_service(settings),
+        line_bot_api=LineBotApi(settings.line_channel_access_token),
+        concurrency=args.concurrency,
+        requests_per_second=args.rps,
+    )
+    report = asyncio.run(
+        service.run(args.campaign_id, args.prompt_template, targets, dry_run=args.dry_run)
+    )
+    print(json.dumps(asdict(report), ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
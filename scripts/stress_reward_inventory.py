@@ -0,0 +1,135 @@
+"""Concurrency check: many workers hammering RewardInventory never over-issue.
+
+Spawns ``--workers`` processes (each with its own RewardInventory, like
+separate uvicorn workers) with ``--threads`` threads each, all claiming against
+one database. Defaults to a throwaway SQLite file; pass ``--database-url`` to
+run against Postgres. Run with ``python -m scripts.stress_reward_inventory``.
+"""
+from __future__ import annotations
+
+import argparse
+import multiprocessing
+import os
+import tempfile
+import threading
+from collections import Counter
+
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.orm import sessionmaker
+
+from app.services.reward_inventory import GRANTED, RewardInventory
+from database.models import Base, RewardInventoryShard, RewardUserDaily
+
+
+def _worker(worker_index: int, database_url: str, args: argparse.Namespace, results) -> None:
+    engine = create_engine(database_url, connect_args=_connect_args(database_url))
+    Session = sessionmaker(bind=engine)
+    inventory = RewardInventory(
+        daily_budget=args.budget,
+        user_daily_cap=args.user_cap,
+        shards=args.shards,
+        batch_size=args.batch_size,
+    )
+    # One counter per thread; Counter increments are not atomic across threads.
+    per_thread = [Counter() for _ in range(args.threads)]
+
+    def _claims(thread_index: int) -> None:
+        granted = per_thread[thread_index]
+        session = Session()
+        try:
+            for attempt in range(args.claims):
+                seed = (worker_index * args.threads + thread_index) * args.claims + attempt
+                user_id = f"user-{seed * 7919 % args.users}"
+                if inventory.claim(session, user_id) == GRANTED:
+                    granted[user_id] += 1
+                session.commit()
+        finally:
+            session.close()
+
+    threads = [threading.Thread(target=_claims, args=(i,)) for i in range(args.threads)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    granted = Counter()
+    for counter in per_thread:
+        granted.update(counter)
+    results.put(dict(granted))
+
+
+def _connect_args(database_url: str) -> dict:
+    return {"timeout": 60, "check_same_thread": False} if database_url.startswith("sqlite") else {}
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--database-url")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--claims", type=int, default=60, help="claims per thread")
+    parser.add_argument("--users", type=int, default=300)
+    parser.add_argument("--budget", type=int, default=500)
+    parser.add_argument("--user-cap", type=int, default=3)
+    parser.add_argument("--shards", type=int, default=8)
+    parser.add_argument("--batch-size", type=int, default=10)
+    return parser
+
+
+def run(args: argparse.Namespace) -> dict:
+    """Run the workers and check the database; raises AssertionError on over-issue."""
+
+    database_url = args.database_url or "sqlite:///" + os.path.join(
+        tempfile.mkdtemp(), "rewards.db"
+    )
+    engine = create_engine(database_url, connect_args=_connect_args(database_url))
+    Base.metadata.create_all(engine, tables=[RewardInventoryShard.__table__, RewardUserDaily.__table__])
+
+    results = multiprocessing.Queue()
+    processes = [
+        multiprocessing.Process(target=_worker, args=(index, database_url, args, results))
+        for index in range(args.workers)
+    ]
+    for process in processes:
+        process.start()
+    granted = Counter()
+    for _ in processes:
+        granted.update(results.get())
+    for process in processes:
+        process.join()
+
+    # The database is the ground truth; the claim results are cross-checked against it.
+    with engine.connect() as conn:
+        remaining = conn.scalar(select(func.sum(RewardInventoryShard.remaining))) or 0
+        db_issued = conn.scalar(select(func.sum(RewardUserDaily.wins))) or 0
+        max_wins = conn.scalar(select(func.max(RewardUserDaily.wins))) or 0
+    engine.dispose()
+    summary = {
+        "attempts": args.workers * args.threads * args.claims,
+        "issued": sum(granted.values()),
+        "db_issued": db_issued,
+        "db_remaining": remaining,
+        "max_wins": max(granted.values(), default=0),
+        "db_max_wins": max_wins,
+    }
+    assert db_issued <= args.budget, "over-issued the daily budget"
+    assert db_issued + remaining <= args.budget
+    assert max_wins <= args.user_cap, "user cap exceeded"
+    assert summary["issued"] == db_issued, "granted claims disagree with reward_user_daily"
+    return summary
+
+
+def main() -> None:
+    args = build_parser().parse_args()
+    summary = run(args)
+    print(
+        f"attempts={summary['attempts']} issued={summary['issued']} "
+        f"(db {summary['db_issued']}) budget={args.budget} db_remaining={summary['db_remaining']}"
+    )
+    print(
+        f"max wins per user={summary['max_wins']} (db {summary['db_max_wins']}, cap {args.user_cap})"
+    )
+    print("OK: never over-issued")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""BroadcastService targeting, rejected chunks and checkpoint resume."""
+from __future__ import annotations
+
+import asyncio
+import json
+
+from linebot.exceptions import LineBotApiError
+from linebot.models import Error
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from app.services.broadcast_service import BroadcastService, BroadcastTarget, load_targets
+from database.models import AppUser, Base
+
+ALICE = "U" + "a" * 32
+BOB = "U" + "b" * 32
+CAROL = "U" + "c" * 32
+
+
+class StubChatService:
+    async def complete(self, prompt: str) -> str:
+        return f"msg:{prompt}"
+
+
+class StubLineBotApi:
+    def __init__(self, reject: set[str] = frozenset()) -> None:
+        self.reject = reject
+        self.calls: list = []
+
+    def multicast(self, to, messages, retry_key=None, **kwargs) -> None:
+        if self.reject & set(to):
+            raise LineBotApiError(400, {}, error=Error(message="The property, 'to', is invalid"))
+        self.calls.append(list(to))
+
+
+def _service(api, tmp_path) -> BroadcastService:
+    return BroadcastService(
+        StubChatService(), api, chunk_size=1, requests_per_second=0, checkpoint_dir=tmp_path
+    )
+
+
+def _targets(*user_ids: str):
+    return [BroadcastTarget(user_id=user_id) for user_id in user_ids]
+
+
+def test_load_targets_keeps_only_line_user_ids():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    with Session(engine) as session:
+        for user_id in (ALICE, BOB, "demo-user", "web-visitor", "U123"):
+            session.add(AppUser(user_id=user_id))
+        session.commit()
+
+        assert [t.user_id for t in load_targets(session)] == [ALICE, BOB]
+        assert [t.user_id for t in load_targets(session, exclude_user_id=BOB)] == [ALICE]
+
+
+def test_rejected_chunk_is_reported_and_run_continues(tmp_path):
+    api = StubLineBotApi(reject={BOB})
+    report = asyncio.run(_service(api, tmp_path).run("c1", "hi", _targets(ALICE, BOB, CAROL)))
+
+    assert api.calls == [[ALICE], [CAROL]]
+    assert report.chunks_sent == 2
+    assert report.failed_chunks == 1
+    assert report.failed_recipients == 1
+    assert list(report.chunk_errors.values()) == ["400: The property, 'to', is invalid"]
+
+
+def test_resume_skips_sent_users_and_retries_rejected_chunk(tmp_path):
+    asyncio.run(
+        _service(StubLineBotApi(reject={BOB}), tmp_path).run("c1", "hi", _targets(ALICE, BOB))
+    )
+
+    api = StubLineBotApi()
+    report = asyncio.run(_service(api, tmp_path).run("c1", "hi", _targets(ALICE, BOB)))
+
+    assert api.calls == [[BOB]]
+    assert report.skipped_already_sent == 1
+    assert report.generated == 0
+    records = [json.loads(line) for line in (tmp_path / "c1.jsonl").read_text().splitlines()]
+    assert [r["type"] for r in records].count("sent") == 2
+
+
+def test_torn_checkpoint_line_is_ignored(tmp_path):
+    asyncio.run(_service(StubLineBotApi(), tmp_path).run("c1", "hi", _targets(ALICE)))
+    path = tmp_path / "c1.jsonl"
+    path.write_text(path.read_text() + '{"type": "sent", "chu', encoding="utf-8")
+
+    api = StubLineBotApi()
+    report = asyncio.run(_service(api, tmp_path).run("c1", "hi", _targets(ALICE, BOB)))
+
+    assert api.calls == [[BOB]]
+    assert report.skipped_already_sent == 1
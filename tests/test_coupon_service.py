@@ -0,0 +1,35 @@
+"""CouponService redemption idempotency on an in-memory SQLite database."""
+from __future__ import annotations
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from app.services.coupon_service import CONSUMED, KEY_CONFLICT, NOT_FOUND, CouponService
+from database.models import Base
+
+
+@pytest.fixture
+def service():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    with Session(engine) as session:
+        yield CouponService(session)
+
+
+def test_retry_with_same_key_reports_consumed(service):
+    code = service.add_coupon("t", "d").id
+
+    assert service.consume_coupon(code, "key-1") == CONSUMED
+    assert service.consume_coupon(code, "key-1") == CONSUMED
+    assert service.consume_coupon(code) == NOT_FOUND
+
+
+def test_key_reused_for_another_code_is_a_conflict(service):
+    first = service.add_coupon("t", "d").id
+    second = service.add_coupon("t", "d").id
+    service.consume_coupon(first, "key-1")
+
+    assert service.consume_coupon(second, "key-1") == KEY_CONFLICT
+    # The conflicting request must not have redeemed the second coupon.
+    assert [coupon.id for coupon in service.list_coupons()] == [second]
@@ -0,0 +1,56 @@
+"""FileWatch change reporting and the hot-reloading KeywordRouter built on it."""
+from __future__ import annotations
+
+import json
+import os
+
+from app.services.file_watch import FileWatch
+from app.services.keyword_router import KeywordRouter
+
+
+def _touch(path, content: str, mtime_ns: int) -> None:
+    path.write_text(content, encoding="utf-8")
+    os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+def test_each_change_is_reported_once(tmp_path):
+    path = tmp_path / "rules.json"
+    _touch(path, "[]", 1_000_000_000)
+    watch = FileWatch(path, check_interval=0)
+
+    assert watch.poll() and watch.exists
+    assert not watch.poll()
+
+    _touch(path, "[]", 2_000_000_000)
+    assert watch.poll()
+    assert not watch.poll()
+
+    path.unlink()
+    assert watch.poll() and not watch.exists
+
+    watch.invalidate()
+    assert watch.poll() and not watch.exists
+
+
+def test_interval_limits_stat_calls(tmp_path):
+    path = tmp_path / "rules.json"
+    _touch(path, "[]", 1_000_000_000)
+    watch = FileWatch(path, check_interval=3600, mtime_ns=1_000_000_000)
+
+    _touch(path, "[]", 2_000_000_000)
+    assert not watch.poll()
+    assert watch.poll(force=True)
+
+
+def test_keyword_router_reloads_and_keeps_rules_on_broken_edit(tmp_path):
+    path = tmp_path / "rules.json"
+    _touch(path, json.dumps([{"keywords": ["@a"], "instruction": "A"}]), 1_000_000_000)
+    router = KeywordRouter(path, check_interval=0)
+    assert router.match("@a hi").instruction == "A"
+
+    _touch(path, json.dumps([{"keywords": ["@b"], "instruction": "B"}]), 2_000_000_000)
+    assert router.match("@a hi") is None
+    assert router.match("@b hi").instruction == "B"
+
+    _touch(path, "{not json", 3_000_000_000)
+    assert router.match("@b hi").instruction == "B"
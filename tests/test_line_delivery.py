@@ -0,0 +1,103 @@
+"""LineDelivery reply/push paths against a stub LINE API."""
+from __future__ import annotations
+
+import asyncio
+import time
+from types import SimpleNamespace
+
+import pytest
+from linebot.exceptions import LineBotApiError
+from linebot.models import Error, TextSendMessage
+
+from app.services import line_delivery
+from app.services.line_delivery import LineDelivery
+
+
+class StubLineBotApi:
+    def __init__(self, reply_error: LineBotApiError | None = None) -> None:
+        self.reply_error = reply_error
+        self.replies: list = []
+        self.pushes: list = []
+
+    def reply_message(self, reply_token, messages) -> None:
+        if self.reply_error is not None:
+            raise self.reply_error
+        self.replies.append((reply_token, messages))
+
+    def push_message(self, to, messages) -> None:
+        self.pushes.append((to, messages))
+
+
+def _event(age: float = 0.0, source_type: str = "user"):
+    source = SimpleNamespace(type=source_type, user_id="U1", group_id="G1", room_id="R1")
+    return SimpleNamespace(
+        timestamp=int((time.time() - age) * 1000),
+        reply_token="reply-token",
+        source=source,
+    )
+
+
+MESSAGE = TextSendMessage(text="hi")
+
+
+def test_fresh_event_uses_reply():
+    api = StubLineBotApi()
+    delivery = LineDelivery(api, "token", reply_deadline=50)
+
+    assert asyncio.run(delivery.deliver(_event(age=1), MESSAGE)) == "reply"
+    assert api.replies == [("reply-token", MESSAGE)]
+    assert api.pushes == []
+    assert delivery.stats() == {"reply": 1}
+
+
+def test_old_event_uses_push():
+    api = StubLineBotApi()
+    delivery = LineDelivery(api, "token", reply_deadline=50)
+
+    assert asyncio.run(delivery.deliver(_event(age=55), MESSAGE)) == "push"
+    assert api.replies == []
+    assert api.pushes == [("U1", MESSAGE)]
+    assert delivery.stats() == {"reply_expired": 1, "push": 1}
+
+
+def test_rejected_reply_falls_back_to_push():
+    error = LineBotApiError(status_code=400, headers={}, error=Error(message="Invalid reply token"))
+    api = StubLineBotApi(reply_error=error)
+    delivery = LineDelivery(api, "token", reply_deadline=50)
+
+    assert asyncio.run(delivery.deliver(_event(age=1, source_type="group"), MESSAGE)) == "push"
+    assert api.pushes == [("G1", MESSAGE)]
+    assert delivery.stats() == {"reply_rejected": 1, "push": 1}
+
+
+def test_server_error_on_reply_is_not_swallowed():
+    error = LineBotApiError(status_code=500, headers={}, error=Error(message="boom"))
+    api = StubLineBotApi(reply_error=error)
+    delivery = LineDelivery(api, "token", reply_deadline=50)
+
+    with pytest.raises(LineBotApiError):
+        asyncio.run(delivery.deliver(_event(age=1), MESSAGE))
+    assert api.pushes == []
+
+
+def test_loading_animation_only_for_user_chats(monkeypatch):
+    calls = []
+
+    def fake_post(url, headers, json, timeout):
+        calls.append((url, headers, json))
+        return SimpleNamespace(raise_for_status=lambda: None)
+
+    monkeypatch.setattr(line_delivery.requests, "post", fake_post)
+    delivery = LineDelivery(
+        StubLineBotApi(), "token", loading_seconds=22, loading_endpoint="http://stub/loading"
+    )
+
+    asyncio.run(delivery.start_loading(_event(source_type="group")))
+    asyncio.run(delivery.start_loading(_event(source_type="room")))
+    assert calls == []
+
+    asyncio.run(delivery.start_loading(_event()))
+    assert calls == [
+        ("http://stub/loading", {"Authorization": "Bearer token"}, {"chatId": "U1", "loadingSeconds": 20})
+    ]
+    assert delivery.stats() == {"loading_started": 1}
@@ -0,0 +1,59 @@
+"""Webhook fan-out: one failing event must not fail the whole delivery."""
+from __future__ import annotations
+
+import asyncio
+from types import SimpleNamespace
+
+from linebot.models import MessageEvent, TextMessage
+
+from app.routers.line import _handle_webhook
+from app.services.base_chat_service import ChatReply
+
+
+class StubRequest:
+    async def body(self) -> bytes:
+        return b"{}"
+
+
+class StubChatService:
+    async def respond(self, user_text: str) -> ChatReply:
+        if user_text == "boom":
+            raise RuntimeError("upstream exploded")
+        return ChatReply(text=f"re:{user_text}")
+
+
+class StubDelivery:
+    def __init__(self) -> None:
+        self.delivered: list = []
+
+    async def start_loading(self, event) -> None:
+        return None
+
+    async def deliver(self, event, message) -> str:
+        self.delivered.append(message.text)
+        return "reply"
+
+
+def _event(text: str, message_id: str) -> MessageEvent:
+    return MessageEvent(
+        timestamp=0,
+        reply_token="reply-token",
+        message=TextMessage(id=message_id, text=text),
+    )
+
+
+def test_failed_event_is_logged_and_others_are_answered(caplog):
+    events = [_event("hi", "1"), _event("boom", "2"), _event("there", "3")]
+    delivery = StubDelivery()
+    channel = SimpleNamespace(
+        name="default",
+        parser=SimpleNamespace(parse=lambda body, signature: events),
+        chat_service=StubChatService(),
+        delivery=delivery,
+    )
+
+    result = asyncio.run(_handle_webhook(StubRequest(), "signature", channel))
+
+    assert result == {"received_events": 3}
+    assert delivery.delivered == ["re:hi", "re:there"]
+    assert "LINE event 2 on channel default failed" in caplog.text
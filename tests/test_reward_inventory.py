@@ -0,0 +1,26 @@
+"""Small multi-process run of the reward inventory stress check."""
+from __future__ import annotations
+
+from scripts.stress_reward_inventory import build_parser, run
+
+
+def test_concurrent_workers_never_over_issue(tmp_path):
+    args = build_parser().parse_args(
+        [
+            "--database-url", f"sqlite:///{tmp_path / 'rewards.db'}",
+            "--workers", "2",
+            "--threads", "3",
+            "--claims", "20",
+            "--users", "15",
+            "--budget", "40",
+            "--user-cap", "2",
+            "--shards", "4",
+            "--batch-size", "5",
+        ]
+    )
+
+    summary = run(args)
+
+    # 120 attempts against a budget of 40: the budget, not demand, is the limit.
+    assert 0 < summary["db_issued"] <= 40
+    assert summary["db_max_wins"] <= 2